@@ -0,0 +1,67 @@
+"""
+Cost of the structural lookups done while rendering a mentoring block with hundreds of
+children - `title` and `header` (each read twice by the template), the number of steps and the
+list of the children to render - with the previous scans of all the children and with the
+`child_roles` index.
+
+    python -m benchmarks.bench_child_roles --children 500
+"""
+import argparse
+
+from lazy import lazy
+from mock import MagicMock, Mock
+
+from .common import bench, setup_django
+
+setup_django()
+
+from xblock.field_data import DictFieldData  # noqa: E402
+
+from mentoring.header import SharedHeaderBlock  # noqa: E402
+from mentoring.mentoring import MentoringBlock  # noqa: E402
+from mentoring.title import TitleBlock  # noqa: E402
+
+
+def scan_lookups(block):
+    """
+    Replica of the previous lookups, each one iterating over all the children
+    """
+    for _ in range(2):
+        next((child for child in block.get_children_objects() if isinstance(child, TitleBlock)), None)
+        next((child for child in block.get_children_objects() if isinstance(child, SharedHeaderBlock)), None)
+    renderable = [child for child in block.get_children_objects()
+                  if not isinstance(child, MentoringBlock.FLOATING_BLOCKS)]
+    return len(renderable), renderable
+
+
+def index_lookups(block, rebuild=True):
+    if rebuild:
+        # The index is built once per request, include building it
+        lazy.invalidate(block, 'child_roles')
+    for _ in range(2):
+        block.title  # pylint: disable=pointless-statement
+        block.header  # pylint: disable=pointless-statement
+    return len(block.child_roles.renderable), block.child_roles.renderable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--children', type=int, default=500)
+    args = parser.parse_args()
+
+    xml_content = '<mentoring>{}<title>Title</title><shared-header><p>Header</p></shared-header>{}</mentoring>'.format(
+        ''.join('<html><p>{}</p></html>'.format(i) for i in range(args.children // 2)),
+        ''.join('<html><p>{}</p></html>'.format(i) for i in range(args.children // 2)),
+    )
+    block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': xml_content}), Mock())
+    block.get_children_objects()
+    assert scan_lookups(block) == index_lookups(block)
+
+    bench('scans over {} children'.format(args.children), lambda: scan_lookups(block))
+    bench('child_roles index over {} children'.format(args.children), lambda: index_lookups(block))
+    bench('child_roles index, already built',
+          lambda: index_lookups(block, rebuild=False))
+
+
+if __name__ == '__main__':
+    main()
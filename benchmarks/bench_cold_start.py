@@ -0,0 +1,63 @@
+"""
+Cold-start cost of the first mentoring view in a fresh worker: importing the XBlock, then
+building the default mentoring block and rendering its student view. Every run is a new Python
+process, with the tag -> class resolution of the light children going through the
+`light_child_registry` or through `LightChild.load_class()` per XML element.
+
+    python -m benchmarks.bench_cold_start --runs 20
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+RESOLVERS = ('registry', 'load_class')
+
+
+def child(resolver):
+    from .common import create_tables, setup_django
+    setup_django()
+    create_tables()
+
+    start = time.perf_counter()
+    from mock import MagicMock, Mock
+    from xblock.field_data import DictFieldData
+
+    from mentoring.light_children import LightChild, LightChildrenMixin
+    from mentoring.mentoring import MentoringBlock
+    imported = time.perf_counter()
+
+    if resolver == 'load_class':
+        LightChildrenMixin.get_class_by_element = classmethod(lambda cls, xml_tag: LightChild.load_class(xml_tag))
+
+    block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+    block.student_view({})
+    rendered = time.perf_counter()
+    print(json.dumps({'import': imported - start, 'first_view': rendered - imported}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--child', choices=RESOLVERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    for resolver in RESOLVERS:
+        command = [sys.executable, '-m', 'benchmarks.bench_cold_start', '--child', resolver]
+        timings = [json.loads(subprocess.check_output(command)) for _ in range(args.runs)]
+        print('{:<12} import {:>8.1f} ms   first view {:>8.1f} ms   (median of {} runs)'.format(
+            resolver,
+            statistics.median(timing['import'] for timing in timings) * 1e3,
+            statistics.median(timing['first_view'] for timing in timings) * 1e3,
+            args.runs,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the export engines of MentoringDataExportBlock on a synthetic course, stored in an
+in-memory SQLite database. Every student answers every question.
+
+    python -m benchmarks.bench_dataexport --students 50000 --answers 200
+
+The defaults are smaller, to keep the run (and the data generation) short.
+"""
+import argparse
+import time
+import tracemalloc
+
+from mock import MagicMock, Mock
+
+from .common import create_tables, setup_django
+
+setup_django()
+
+from xblock.field_data import DictFieldData  # noqa: E402
+
+from mentoring.dataexport import EXPORT_ENGINES, MentoringDataExportBlock  # noqa: E402
+from mentoring.models import Answer  # noqa: E402
+
+
+def populate(num_students, num_answers, batch_size=10000):
+    batch = []
+    for student in range(num_students):
+        for answer in range(num_answers):
+            batch.append(Answer(
+                student_id='student{:06d}'.format(student),
+                course_id='course',
+                name='answer{:03d}'.format(answer),
+                student_input='Answer {} of student {}'.format(answer, student),
+            ))
+            if len(batch) >= batch_size:
+                Answer.objects.bulk_create(batch)
+                batch = []
+    Answer.objects.bulk_create(batch)
+
+
+def run(block, engine):
+    tracemalloc.start()
+    start = time.perf_counter()
+    num_bytes = 0
+    num_lines = 0
+    for line in block.get_csv(engine=engine):
+        num_bytes += len(line)
+        num_lines += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<10} {:>8} lines {:>12} bytes {:>10.2f} s {:>10.1f} MiB peak'.format(
+        engine, num_lines, num_bytes, elapsed, peak / 2 ** 20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--answers', type=int, default=50)
+    args = parser.parse_args()
+
+    create_tables()
+    populate(args.students, args.answers)
+
+    block = MentoringDataExportBlock(MagicMock(), DictFieldData({}), Mock())
+    block.xmodule_runtime = Mock(course_id='course')
+    for engine in EXPORT_ENGINES:
+        run(block, engine)
+
+
+if __name__ == '__main__':
+    main()
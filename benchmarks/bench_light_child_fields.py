@@ -0,0 +1,88 @@
+"""
+Attribute access latency and memory use of the LightChildField storage, compared to the
+previous storage, which kept the values of all the instances in a WeakKeyDictionary per field.
+
+    python -m benchmarks.bench_light_child_fields
+"""
+import tracemalloc
+from weakref import WeakKeyDictionary
+
+from mock import Mock
+
+from .common import bench, setup_django
+
+setup_django()
+
+from mentoring.light_children import Boolean, Float, Integer, LightChild, List, Scope, String  # noqa: E402
+
+
+class WeakKeyDictionaryField:
+    """
+    Replica of the previous LightChildField storage
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.data = WeakKeyDictionary()
+
+    def __get__(self, instance, owner):
+        instance.load_student_data()
+        return self.data.get(instance, self.default)
+
+    def __set__(self, instance, value):
+        self.data[instance] = value
+
+
+class SlotStorageChild(LightChild):
+    string = String(scope=Scope.content, default='')
+    integer = Integer(scope=Scope.content, default=0)
+    boolean = Boolean(scope=Scope.content, default=False)
+    float = Float(scope=Scope.content, default=0)
+    list = List(scope=Scope.content, default=[])
+
+
+class WeakKeyDictionaryChild(LightChild):
+    string = WeakKeyDictionaryField('')
+    integer = WeakKeyDictionaryField(0)
+    boolean = WeakKeyDictionaryField(False)
+    float = WeakKeyDictionaryField(0)
+    list = WeakKeyDictionaryField([])
+
+
+FIELD_NAMES = ('string', 'integer', 'boolean', 'float', 'list')
+VALUES = {'string': 'text', 'integer': 3, 'boolean': True, 'float': 1.5, 'list': ['a', 'b']}
+
+
+def build_children(cls, parent, count):
+    children = []
+    for _ in range(count):
+        child = cls(parent)
+        for name, value in VALUES.items():
+            setattr(child, name, value)
+        children.append(child)
+    return children
+
+
+def measure_memory(cls, parent, count=10000):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    children = build_children(cls, parent, count)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del children
+    return size / count
+
+
+def main():
+    parent = Mock()
+    for cls in (WeakKeyDictionaryChild, SlotStorageChild):
+        child = build_children(cls, parent, 1)[0]
+        for name in FIELD_NAMES:
+            bench('{} get {}'.format(cls.__name__, name), lambda: getattr(child, name), number=100000)
+        bench('{} set string'.format(cls.__name__), lambda: setattr(child, 'string', 'other'), number=100000)
+        print('{:<60} {:>12.0f} B'.format('{} memory per child'.format(cls.__name__), measure_memory(cls, parent)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+SQLite query plans of the hot queries on Answer and LightChild - the lookups of a student's data
+and the data export of a course - with the indexes of the migration 0005 and with the current ones.
+
+    python -m benchmarks.bench_query_plans
+"""
+from .common import setup_django
+
+setup_django()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Max  # noqa: E402
+
+from mentoring.models import Answer, LightChild  # noqa: E402
+
+
+def get_queries():
+    answers = Answer.objects.filter(course_id='course')
+    return [
+        ('answer lookup', Answer.objects.filter(student_id='student', course_id='course', name='answer')),
+        ('light children prefetch', LightChild.objects.filter(
+            student_id='student', course_id='course', name__in=['block-a', 'block-b'])),
+        ('export answer names', answers.values_list('name', flat=True).distinct().order_by('name')),
+        ('export rows', answers.order_by('student_id', 'name').values_list('student_id', 'name', 'student_input')),
+        ('export pivot', answers.order_by().values('student_id').annotate(answer=Max('student_input'))
+                                .order_by('student_id')),
+    ]
+
+
+def print_plans(title):
+    print(title)
+    with connection.cursor() as cursor:
+        for label, queryset in get_queries():
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            print('  {}'.format(label))
+            for row in cursor.fetchall():
+                print('    {}'.format(row[-1]))
+
+
+def main():
+    call_command('migrate', 'mentoring', '0005', verbosity=0)
+    print_plans('Migration 0005')
+    call_command('migrate', 'mentoring', verbosity=0)
+    print_plans('Current')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Render cost of the templates rendered once per choice (tip_choice_group.html, by
+MRQBlock.calculate_results) and once per tip (tip.html, by TipBlock.render), with the compiled
+template cache of MentoringResourceLoader and with the uncached xblockutils ResourceLoader.
+
+    python -m benchmarks.bench_templates
+"""
+from xblockutils.resources import ResourceLoader
+
+from .common import bench, setup_django
+
+setup_django()
+
+from mentoring.utils import MentoringResourceLoader  # noqa: E402
+
+TEMPLATES = (
+    ('templates/html/tip_choice_group.html', {'tips_fragments': [{'body_html': '<div class="tip">Tip</div>'}]}),
+    ('templates/html/tip.html', {'self': {'content': 'Tip', 'width': 200, 'height': 100}, 'named_children': []}),
+)
+
+
+def main():
+    cached = MentoringResourceLoader('mentoring.utils')
+    uncached = ResourceLoader('mentoring.utils')
+    for path, context in TEMPLATES:
+        bench('uncached {}'.format(path), lambda: uncached.render_django_template(path, dict(context)), number=2000)
+        bench('cached {}'.format(path), lambda: cached.render_django_template(path, dict(context)), number=2000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Helpers shared by the benchmarks
+
+Run the benchmarks from the root of the repository, e.g. `python -m benchmarks.bench_light_child_fields`
+"""
+import timeit
+
+import django
+from django.conf import settings
+
+
+def setup_django(**extra_settings):
+    """
+    Configure a minimal Django environment, with an in-memory SQLite database
+    """
+    if settings.configured:
+        return
+    settings.configure(
+        INSTALLED_APPS=['mentoring'],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+        **extra_settings
+    )
+    django.setup()
+
+
+def create_tables():
+    from django.core.management import call_command
+    call_command('migrate', 'mentoring', verbosity=0)
+
+
+def bench(label, func, number=1000, repeat=5):
+    """
+    Print the best time per call of `func`, over `repeat` runs of `number` calls
+    """
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print('{:<60} {:>12.2f} us'.format(label, best * 1e6))
+    return best
@@ -28,7 +28,6 @@ from lazy import lazy
 from xblock.fragment import Fragment
 
 from .light_children import Boolean, Float, Integer, LightChild, Scope, String
-from .models import Answer
 from .step import StepMixin
 from .utils import loader
 
@@ -70,6 +69,10 @@ class AnswerBlock(LightChild, StepMixin):
 
         return block
 
+    @classmethod
+    def get_answer_names(cls, attrs):
+        return tuple(name for name in (attrs.get('name'), attrs.get('default_from')) if name)
+
     @lazy
     def student_input(self):  # pylint: disable=E0202
         """
@@ -150,7 +153,7 @@ class AnswerBlock(LightChild, StepMixin):
             answer_data = self.get_model_object()
             if answer_data.student_input != self.student_input and not self.read_only:
                 answer_data.student_input = self.student_input
-                answer_data.save()
+                self.xblock_container.save_model_object(answer_data, ['student_input'])
 
     def get_model_object(self, name=None):
         """
@@ -167,9 +170,5 @@ class AnswerBlock(LightChild, StepMixin):
         student_id = self.xmodule_runtime.anonymous_student_id
         course_id = self.xmodule_runtime.course_id
 
-        answer_data, _ = Answer.objects.get_or_create(
-            student_id=student_id,
-            course_id=course_id,
-            name=name,
-        )
-        return answer_data
+        # All the answers of the block are fetched at once, the rows are only created when saved
+        return self.xblock_container.get_answer_store(student_id, course_id).get(name)
@@ -0,0 +1,70 @@
+#
+# Copyright (C) 2014 Harvard
+#
+# Authors:
+#          Xavier Antoviaque <xavier@antoviaque.org>
+#
+# This software's license gives you freedom; you can copy, convey,
+# propagate, redistribute and/or modify this program under the terms of
+# the GNU Affero General Public License (AGPL) as published by the Free
+# Software Foundation (FSF), either version 3 of the License, or (at your
+# option) any later version of the AGPL published by the FSF.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Affero
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program in a file in the toplevel directory called
+# "AGPLv3".  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# Imports ###########################################################
+
+from .models import Answer
+
+
+# Classes ###########################################################
+
+class AnswerStore:
+    """
+    The Answer model objects of a student read while handling a request, by name.
+
+    All the answer names referenced by a block tree (its answers, the answers they get their
+    default value from, the answers displayed in its tables) are fetched with a single query the
+    first time one of them is needed. Names which don't have a row yet get an unsaved object with
+    the default values - the row is only created when the answer is saved.
+    """
+
+    def __init__(self, student_id, course_id, names):
+        self.student_id = student_id
+        self.course_id = course_id
+        self.names = set(names)
+        self._answers = None
+
+    def load(self, names):
+        """
+        Fetch the Answer objects named `names` which aren't loaded yet, with one query
+        """
+        names = [name for name in names if name not in self._answers]
+        if not names:
+            return
+        for answer in Answer.objects.filter(student_id=self.student_id, course_id=self.course_id, name__in=names):
+            self._answers[answer.name] = answer
+        for name in names:
+            if name not in self._answers:
+                self._answers[name] = Answer(student_id=self.student_id, course_id=self.course_id, name=name)
+
+    def get(self, name):
+        """
+        Returns the Answer object named `name` - always the same object for a given name
+        """
+        if self._answers is None:
+            self._answers = {}
+            self.load(self.names | {name})
+        elif name not in self._answers:
+            # Not referenced by the block tree, fetch it on its own
+            self.load([name])
+        return self._answers[name]
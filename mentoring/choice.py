@@ -25,6 +25,7 @@
 import logging
 
 from .light_children import LightChild, Scope, String
+from .render_cache import cached_fragment
 from .utils import ContextConstants, loader
 
 # Globals ###########################################################
@@ -42,6 +43,7 @@ class ChoiceBlock(LightChild):
     content = String(help="Human-readable version of the choice value", scope=Scope.content, default="")
     has_children = True
 
+    @cached_fragment
     def render(self):
         # return self.content
         """
@@ -24,19 +24,29 @@
 
 import logging
 from itertools import groupby
+from operator import itemgetter
 
+from django.db.models import Case, F, Max, TextField, Value, When
 from webob import Response
 from xblock.core import XBlock
 from xblock.fields import Scope, String
 from xblock.fragment import Fragment
 
 from .models import Answer
-from .utils import list2csv, loader
+from .utils import CSVRowWriter, loader
 
 # Globals ###########################################################
 
 log = logging.getLogger(__name__)
 
+# Number of rows fetched from the database at once when exporting
+CSV_CHUNK_SIZE = 2000
+
+# Ways to turn the answers into one row per student:
+# * 'python': answers are read ordered by student, and grouped in Python
+# * 'database': the database does the pivot, with one conditional aggregate per answer name
+EXPORT_ENGINES = ('python', 'database')
+
 
 # Classes ###########################################################
 
@@ -65,35 +75,62 @@ class MentoringDataExportBlock(XBlock):
 
     @XBlock.handler
     def download_csv(self, request, suffix=''):
+        engine = request.GET.get('engine', EXPORT_ENGINES[0])
+        if engine not in EXPORT_ENGINES:
+            return Response('Unknown export engine: {}'.format(engine), status=400, content_type='text/plain')
+
         response = Response(content_type='text/csv')
-        response.app_iter = self.get_csv()
+        response.app_iter = self.get_csv(engine)
         response.content_disposition = 'attachment; filename=course_data.csv'
         return response
 
-    def get_csv(self):
+    def get_csv(self, engine='python'):
+        """
+        Generates the lines of the CSV export, one row per student. Rows are streamed from the
+        database in chunks, so memory use doesn't depend on the number of students.
+
+        `engine` selects how the answers are pivoted into student rows, see `EXPORT_ENGINES`.
+        """
         course_id = self.xmodule_runtime.course_id
 
-        answers = Answer.objects.filter(course_id=course_id).order_by('student_id', 'name')
-        answers_names = answers.values_list('name', flat=True).distinct().order_by('name')
+        answers = Answer.objects.filter(course_id=course_id)
+        answers_names = list(answers.values_list('name', flat=True).distinct().order_by('name'))
+        to_csv = CSVRowWriter()
 
         # Header line
-        yield list2csv(['student_id'] + list(answers_names))
-
-        if answers_names:
-            for _, student_answers in groupby(answers, lambda x: x.student_id):
-                row = []
-                next_answer_idx = 0
-                for answer in student_answers:
-                    if not row:
-                        row = [answer.student_id]
-
-                    while answer.name != answers_names[next_answer_idx]:
-                        # Still add answer row to CSV when they don't exist in DB
-                        row.append('')
-                        next_answer_idx += 1
-
-                    row.append(answer.student_input)
-                    next_answer_idx += 1
-
-                if row:
-                    yield list2csv(row)
+        yield to_csv(['student_id'] + answers_names)
+
+        if not answers_names:
+            return
+
+        if engine == 'database':
+            rows = self.pivot_in_database(answers, answers_names)
+        else:
+            rows = self.pivot_in_python(answers, answers_names)
+
+        for row in rows:
+            yield to_csv(row)
+
+    def pivot_in_python(self, answers, answers_names):
+        columns = {name: index for index, name in enumerate(answers_names)}
+        rows = answers.order_by('student_id', 'name').values_list('student_id', 'name', 'student_input')
+        for student_id, student_answers in groupby(rows.iterator(chunk_size=CSV_CHUNK_SIZE), itemgetter(0)):
+            # Still add answer columns to CSV when they don't exist in DB
+            row = [''] * len(answers_names)
+            for _, name, student_input in student_answers:
+                row[columns[name]] = student_input
+            yield [student_id] + row
+
+    def pivot_in_database(self, answers, answers_names):
+        # There is at most one answer per student and name, so the max is that answer, or ''
+        columns = {
+            'answer_{}'.format(index): Max(Case(
+                When(name=name, then=F('student_input')),
+                default=Value(''),
+                output_field=TextField(),
+            ))
+            for index, name in enumerate(answers_names)
+        }
+        rows = answers.order_by().values('student_id').annotate(**columns).order_by('student_id')
+        rows = rows.values_list('student_id', *columns)
+        return (list(row) for row in rows.iterator(chunk_size=CSV_CHUNK_SIZE))
@@ -27,6 +27,7 @@ from lxml import etree
 from xblock.fragment import Fragment
 
 from .light_children import LightChild, Scope, String
+from .render_cache import cached_fragment
 
 log = logging.getLogger(__name__)
 
@@ -48,6 +49,7 @@ class SharedHeaderBlock(LightChild):
 
         return block
 
+    @cached_fragment
     def student_view(self, context=None):
         return Fragment("<script type='text/template' id='light-child-template'>\n{}\n</script>".format(
             self.content
@@ -28,6 +28,7 @@ from lxml import etree
 from xblock.fragment import Fragment
 
 from .light_children import LightChild, Scope, String
+from .render_cache import cached_fragment
 # Globals ###########################################################
 from .utils import ContextConstants
 
@@ -54,6 +55,7 @@ class HTMLBlock(LightChild):
 
         return block
 
+    @cached_fragment
     def student_view(self, context=None):
         as_template = context.get(ContextConstants.AS_TEMPLATE, True) if context is not None else True
         if as_template:
@@ -22,21 +22,26 @@
 
 # Imports ###########################################################
 
+import hashlib
 import json
 import logging
+from collections import namedtuple
+from contextlib import contextmanager
 from io import StringIO
-from weakref import WeakKeyDictionary
 
 from django.urls import reverse
 from lazy import lazy
 from lxml import etree
 from xblock.core import XBlock
 from xblock.fragment import Fragment
-from xblock.plugin import Plugin
+from xblock.plugin import Plugin, PluginMissingError
 from xblockutils.publish_event import PublishEventMixin
 
+from .answer_store import AnswerStore
 from .models import LightChild as LightChildModel
-from .utils import XBlockWithChildrenFragmentsMixin
+from .unit_of_work import UnitOfWork
+from .utils import (PACKAGE_VERSION, ContextConstants, LRUCache, XBlockWithChildrenFragmentsMixin,
+                    add_unique_frag_resources)
 
 try:
     from xmodule_modifiers import replace_jump_to_id_urls  # pylint: disable=import-error
@@ -50,9 +55,183 @@ except Exception:
 
 log = logging.getLogger(__name__)
 
+COMPILED_CHILDREN_CACHE_SIZE = 256
+
+# Parsed light children trees, shared by all the blocks of the process. See `CompiledLightChildren`.
+compiled_children_cache = LRUCache(maxsize=COMPILED_CHILDREN_CACHE_SIZE)
+
+JUMP_TO_URL_CACHE_SIZE = 1024
+
+# Resolved `/jump_to_id` URL prefixes, by course id
+jump_to_url_cache = LRUCache(maxsize=JUMP_TO_URL_CACHE_SIZE)
+
+# Format of `CompiledLightChildren.serialize()` - bump it when the format or the specs change
+COMPILED_CONTENT_VERSION = 1
+
+# Instance attributes of a LightChild which are not set from the XML content
+LIGHT_CHILD_INTERNALS = frozenset(('parent', 'location', 'scope_ids', 'xblock_container', 'light_children',
+                                   '_light_children_specs', '_student_data_loaded'))
+
+
+# Functions #########################################################
+
+def set_block_attributes(block, attr):
+    """
+    Set the XML attributes `attr` (a list of (name, value) pairs) on `block`
+    """
+    for name, value in attr:
+        try:
+            setattr(block, name, value)
+        except AttributeError:
+            # URL name is handled in a special manner, depending on the runtime.
+            if name == 'url_name':
+                continue
+            raise
+
+
+def compile_light_children(children):
+    """
+    Returns the immutable `LightChildSpec` tree describing the already built `children`
+    """
+    return tuple(
+        LightChildSpec(child.__class__, child.get_init_attributes(), compile_light_children(child.light_children))
+        for child in children
+    )
+
+
+def iter_light_children_specs(specs):
+    """
+    Iterates depth-first over all the `LightChildSpec` of the tree
+    """
+    for spec in specs:
+        yield spec
+        yield from iter_light_children_specs(spec.children)
+
+
+def iter_light_children(children):
+    """
+    Iterates depth-first over all the light children of the tree
+    """
+    for child in children:
+        yield child
+        yield from iter_light_children(child.get_children_objects())
+
+
+def build_light_children(parent, specs):
+    """
+    Instantiate the light children described by the `LightChildSpec` tuple `specs`, under `parent`
+    """
+    children = []
+    for spec in specs:
+        child = spec.cls(parent)
+        for name, value in spec.attrs:
+            setattr(child, name, value)
+        child.set_light_children_specs(spec.children)
+        children.append(child)
+    return children
+
 
 # Classes ###########################################################
 
+# Class and attributes a light child gets from its XML node, along with the specs of its own children
+LightChildSpec = namedtuple('LightChildSpec', ['cls', 'attrs', 'children'])
+
+
+class CompiledLightChildren(namedtuple('CompiledLightChildren', ['attrs', 'children'])):
+    """
+    Parsed form of a `xml_content`: the attributes of the root node and the specs of the light
+    children. Immutable, so it can be shared between the blocks of all the students, each of them
+    only having to instantiate its own light children.
+    """
+
+    @classmethod
+    def get_cache_key(cls, block):
+        return (block.__class__, block.name, block.xml_content_hash)
+
+    def serialize(self, block):
+        """
+        Compact JSON form of the compiled content of `block`, for `load_compiled_content()` - a
+        flat table of the nodes, with the class id (XML tag) and attributes of each node, and the
+        index of its parent. Returns None if the tree can't be serialized.
+        """
+        nodes = []
+
+        def add_nodes(specs, parent_index):
+            for spec in specs:
+                nodes.append([parent_index, light_child_registry.get_tag(spec.cls),
+                              [list(attr) for attr in spec.attrs]])
+                add_nodes(spec.children, len(nodes) - 1)
+
+        try:
+            add_nodes(self.children, -1)
+            return json.dumps({
+                'version': COMPILED_CONTENT_VERSION,
+                'xml_content_hash': block.xml_content_hash,
+                'name': block.name,
+                'attrs': [list(attr) for attr in self.attrs],
+                'nodes': nodes,
+            }, separators=(',', ':'))
+        except (KeyError, TypeError, ValueError):
+            log.warning('Unable to serialize the compiled content of %s', block.name, exc_info=True)
+            return None
+
+    @classmethod
+    def deserialize(cls, block, data):
+        """
+        Returns the `CompiledLightChildren` of the JSON produced by `serialize()`, or None when it
+        doesn't match the current format version or the content of `block`
+        """
+        try:
+            data = json.loads(data)
+            if (not isinstance(data, dict) or data.get('version') != COMPILED_CONTENT_VERSION or
+                    data.get('xml_content_hash') != block.xml_content_hash or data.get('name') != block.name):
+                return None
+
+            nodes = data['nodes']
+            children = [[] for _ in nodes]
+            roots = []
+            classes = [light_child_registry.get_class(tag) for _, tag, _ in nodes]
+            # Parents always come before their children, build the specs from the end of the table
+            for index in range(len(nodes) - 1, -1, -1):
+                parent_index, _, attrs = nodes[index]
+                if not -1 <= parent_index < index:
+                    raise ValueError('Invalid parent index {} for node {}'.format(parent_index, index))
+                spec = LightChildSpec(classes[index], cls.deserialize_attrs(attrs), tuple(reversed(children[index])))
+                (children[parent_index] if parent_index >= 0 else roots).append(spec)
+            return cls(cls.deserialize_attrs(data['attrs']), tuple(reversed(roots)))
+        except (KeyError, TypeError, ValueError, IndexError, PluginMissingError):
+            # Truncated or hand-edited content - the caller compiles the XML content instead
+            log.warning('Invalid compiled content for %s, ignoring it', block.name, exc_info=True)
+            return None
+
+    @staticmethod
+    def deserialize_attrs(attrs):
+        """
+        The (name, value) pairs of the serialized `attrs`
+        """
+        attrs = tuple(tuple(attr) for attr in attrs)
+        if any(len(attr) != 2 or not isinstance(attr[0], str) for attr in attrs):
+            raise ValueError('Invalid attributes {!r}'.format(attrs))
+        return attrs
+
+    @lazy
+    def names(self):
+        """
+        Names of all the light children of the tree
+        """
+        return tuple(dict(spec.attrs).get('name') for spec in iter_light_children_specs(self.children))
+
+    @lazy
+    def answer_names(self):
+        """
+        Names of all the Answer model objects read by the light children of the tree
+        """
+        names = set()
+        for spec in iter_light_children_specs(self.children):
+            names.update(spec.cls.get_answer_names(dict(spec.attrs)))
+        return frozenset(names)
+
+
 class LightChildrenMixin(XBlockWithChildrenFragmentsMixin):
     """
     Allows to use lightweight children on a given XBlock, which will
@@ -74,6 +253,12 @@ class LightChildrenMixin(XBlockWithChildrenFragmentsMixin):
     * fields on LightChild don't have any persistence
     """
 
+    # When True, the light children of a block are only instantiated when they are first
+    # accessed, so a request only builds the subtrees it uses. Read on the `xblock_container`.
+    LAZY_LIGHT_CHILDREN = False
+
+    _light_children_specs = ()
+
     @classmethod
     def parse_xml(cls, node, runtime, keys, id_generator):
         log.debug('parse_xml called')
@@ -99,14 +284,7 @@ class LightChildrenMixin(XBlockWithChildrenFragmentsMixin):
         for child_id, xml_child in enumerate(node):
             cls.add_node_as_child(block, xml_child, child_id)
 
-        for name, value in attr:
-            try:
-                setattr(block, name, value)
-            except AttributeError:
-                # URL name is handled in a special manner, depending on the runtime.
-                if name == 'url_name':
-                    continue
-                raise
+        set_block_attributes(block, attr)
 
         return block
 
@@ -132,22 +310,70 @@ class LightChildrenMixin(XBlockWithChildrenFragmentsMixin):
 
     @classmethod
     def get_class_by_element(cls, xml_tag):
-        return LightChild.load_class(xml_tag)
+        return light_child_registry.get_class(xml_tag)
 
     def load_children_from_xml_content(self):
         """
         Load light children from the `xml_content` attribute
+
+        The XML is only parsed once per process for a given content, the result being kept
+        in `compiled_children_cache`. When the block has a `compiled_content` matching the XML
+        content, it is loaded instead of parsing the XML.
         """
         self.light_children = []
+        self.compiled_children = None
+        self.xml_content_hash = None
         no_content = (not hasattr(self, 'xml_content') or not self.xml_content or
                       callable(self.xml_content))
         if no_content:
             return
 
+        self.xml_content_hash = hashlib.sha1(self.xml_content.encode('utf-8')).hexdigest()
+        cache_key = CompiledLightChildren.get_cache_key(self)
+        compiled = compiled_children_cache.get(cache_key)
+        if compiled is not None:
+            self.set_light_children_specs(compiled.children)
+            set_block_attributes(self, compiled.attrs)
+            self.compiled_children = compiled
+            return
+
+        compiled_content = getattr(self, 'compiled_content', None)
+        if compiled_content:
+            compiled = CompiledLightChildren.deserialize(self, compiled_content)
+            if compiled is not None:
+                self.set_light_children_specs(compiled.children)
+                set_block_attributes(self, compiled.attrs)
+                compiled_children_cache.set(cache_key, compiled)
+                self.compiled_children = compiled
+                return
+            log.info('Compiled content of %s is outdated, parsing its XML content', self.name)
+
         parser = etree.XMLParser(remove_comments=True)
         node = etree.parse(StringIO(self.xml_content), parser=parser).getroot()
         LightChildrenMixin.init_block_from_node(self, node, node.items())
 
+        compiled = CompiledLightChildren(tuple(node.items()), compile_light_children(self.light_children))
+        compiled_children_cache.set(cache_key, compiled)
+        self.compiled_children = compiled
+
+    @lazy
+    def light_children(self):  # pylint: disable=method-hidden
+        """
+        Light children built on first access, from the specs given to `set_light_children_specs()`
+        """
+        return build_light_children(self, self._light_children_specs)
+
+    def set_light_children_specs(self, specs):
+        """
+        Set the light children from a tuple of `LightChildSpec`, instantiating them right away
+        unless the container loads its light children lazily
+        """
+        if self.xblock_container.LAZY_LIGHT_CHILDREN:
+            self._light_children_specs = specs
+            lazy.invalidate(self, 'light_children')
+        else:
+            self.light_children = build_light_children(self, specs)
+
     def get_children_objects(self):
         """
         Replacement for ```[self.runtime.get_block(child_id) for child_id in self.children]```
@@ -165,16 +391,23 @@ class LightChildrenMixin(XBlockWithChildrenFragmentsMixin):
         return frag
 
     def get_children_fragment(self, context, view_name='student_view', instance_of=None,
-                              not_instance_of=None):
+                              not_instance_of=None, children=None):
+        """
+        See `XBlockWithChildrenFragmentsMixin.get_children_fragment()` - `children` allows to
+        render a precomputed selection of the children, instead of all of them
+        """
         fragment = Fragment()
         named_child_frags = []
-        for child in self.get_children_objects():
+        seen_resources = set()
+        if children is None:
+            children = self.get_children_objects()
+        for child in children:
             if instance_of is not None and not isinstance(child, instance_of):
                 continue
             if not_instance_of is not None and isinstance(child, not_instance_of):
                 continue
             frag = self.render_child(child, view_name, context)
-            fragment.add_frag_resources(frag)
+            add_unique_frag_resources(fragment, frag, seen_resources)
             named_child_frags.append((child.name, frag))
         return fragment, named_child_frags
 
@@ -183,41 +416,188 @@ class XBlockWithLightChildren(LightChildrenMixin, XBlock, PublishEventMixin):
     """
     XBlock base class with support for LightChild
     """
+    compiled_children = None
+    xml_content_hash = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.xblock_container = self
+        self._lightchild_data = {}
+        self._answer_stores = {}
+        self._unit_of_work = None
+        self._text_rewriting_deferred = 0
         self.load_children_from_xml_content()
 
+    def compile_xml_content(self):
+        """
+        Load the light children from the `xml_content`, and returns their compiled form serialized
+        for the `compiled_content` field - or '' if it can't be produced
+        """
+        try:
+            self.load_children_from_xml_content()
+        except Exception:  # pylint: disable=broad-except
+            log.warning('Unable to compile the XML content of %s', self.name, exc_info=True)
+            return ''
+        if self.compiled_children is None:
+            return ''
+        return self.compiled_children.serialize(self) or ''
+
+    def get_light_children_names(self):
+        """
+        Names of all the light children of the tree, without instantiating them when possible
+        """
+        if self.compiled_children is not None:
+            return self.compiled_children.names
+        return tuple(child.name for child in iter_light_children(self.get_children_objects()))
+
+    def get_answer_names(self):
+        """
+        Names of all the Answer model objects read by the light children of the tree, without
+        instantiating them when possible
+        """
+        if self.compiled_children is not None:
+            return self.compiled_children.answer_names
+        names = set()
+        for child in iter_light_children(self.get_children_objects()):
+            names.update(child.get_answer_names(dict(child.get_init_attributes())))
+        return frozenset(names)
+
+    def get_answer_store(self, student_id, course_id):
+        """
+        Returns the `AnswerStore` of the student, which fetches all the answers referenced by the
+        light children with a single query - once per request, as for `get_lightchild_data()`
+        """
+        key = (student_id, course_id)
+        if key not in self._answer_stores:
+            self._answer_stores[key] = AnswerStore(student_id, course_id, self.get_answer_names())
+        return self._answer_stores[key]
+
+    def get_lightchild_data(self, student_id, course_id):
+        """
+        Returns a dict of the LightChild model objects of the student, by name, for all the light
+        children of the block. They are fetched with a single query, the first time they are needed
+        on this block instance - so once per request.
+        """
+        key = (student_id, course_id)
+        if key not in self._lightchild_data:
+            names = ['{}-{}'.format(self.url_name, name) for name in self.get_light_children_names() if name]
+            self._lightchild_data[key] = {
+                lightchild_data.name: lightchild_data
+                for lightchild_data in LightChildModel.objects.filter(
+                    student_id=student_id,
+                    course_id=course_id,
+                    name__in=names,
+                )
+            }
+        return self._lightchild_data[key]
+
+    @property
+    def in_unit_of_work(self):
+        return self._unit_of_work is not None
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Collect the model objects saved by the light children while in the `with` block, and
+        write them all at once when leaving it. Nothing is written if an exception is raised.
+        """
+        if self.in_unit_of_work:
+            yield self._unit_of_work
+            return
+
+        self._unit_of_work = UnitOfWork()
+        try:
+            yield self._unit_of_work
+            self._unit_of_work.flush()
+        finally:
+            self._unit_of_work = None
+            # Objects created in bulk don't get their primary key back on all databases
+            self._lightchild_data.clear()
+            self._answer_stores.clear()
+
+    def save_model_object(self, obj, update_fields):
+        """
+        Save the model object `obj`, deferring it to the end of the current unit of work if any
+        """
+        if self.in_unit_of_work:
+            self._unit_of_work.register(obj, update_fields)
+        elif obj.pk is None:
+            # Rows are read without being created, another request may have created it since
+            saved, _ = obj.__class__.objects.update_or_create(
+                student_id=obj.student_id,
+                course_id=obj.course_id,
+                name=obj.name,
+                defaults={field: getattr(obj, field) for field in update_fields},
+            )
+            obj.pk = saved.pk
+        else:
+            obj.save()
+
     @XBlock.json_handler
     def view(self, data, suffix=''):
         """
         Current HTML view of the XBlock, for refresh by client
         """
 
-        frag = self.student_view({})
+        with self.deferred_text_rewriting():
+            frag = self.student_view({})
         frag = self.fragment_text_rewriting(frag)
 
         return {
             'html': frag.content,
         }
 
-    def fragment_text_rewriting(self, fragment):
-        """
-        Do replacements like `/jump_to_id` URL rewriting in the provided text
-        """
+    def get_course_id(self):
         # TODO: Why do we need to use `xmodule_runtime` and not `runtime`?
         try:
-            course_id = self.xmodule_runtime.course_id
+            return self.xmodule_runtime.course_id
         except AttributeError:
             # TODO-WORKBENCH-WORKAROUND: To allow to load from the workbench
-            course_id = 'sample-course'
+            return 'sample-course'
+
+    @staticmethod
+    def get_jump_to_url(course_id):
+        """
+        Prefix of the `/jump_to_id` URLs of the course, resolved once per course
+        """
+        jump_to_url = jump_to_url_cache.get(course_id)
+        if jump_to_url is None:
+            try:
+                jump_to_url = reverse('jump_to_id', kwargs={'course_id': course_id, 'module_id': ''})
+            except Exception:
+                # TODO-WORKBENCH-WORKAROUND: To allow to load from the workbench
+                jump_to_url = '/jump_to_id'
+            jump_to_url_cache.set(course_id, jump_to_url)
+        return jump_to_url
+
+    @property
+    def text_rewriting_deferred(self):
+        return self._text_rewriting_deferred > 0
 
+    @contextmanager
+    def deferred_text_rewriting(self):
+        """
+        Skip `fragment_text_rewriting()` while in the `with` block - the caller does a single pass
+        over the fragment it assembles instead
+        """
+        self._text_rewriting_deferred += 1
         try:
-            jump_to_url = reverse('jump_to_id', kwargs={'course_id': course_id, 'module_id': ''})
-        except Exception:
-            # TODO-WORKBENCH-WORKAROUND: To allow to load from the workbench
-            jump_to_url = '/jump_to_id'
+            yield
+        finally:
+            self._text_rewriting_deferred -= 1
+
+    def fragment_text_rewriting(self, fragment, deferrable=True):
+        """
+        Do replacements like `/jump_to_id` URL rewriting in the provided text
+
+        Nothing is done when the rewriting is deferred, unless `deferrable` is False - for content
+        which won't be part of the assembled fragment as is (eg. escaped in an attribute)
+        """
+        if deferrable and self.text_rewriting_deferred:
+            return fragment
 
+        course_id = self.get_course_id()
+        jump_to_url = self.get_jump_to_url(course_id)
         fragment = replace_jump_to_id_urls(course_id, jump_to_url, self, 'student_view', fragment, {})
         return fragment
 
@@ -228,6 +608,8 @@ class LightChild(Plugin, LightChildrenMixin):
     """
     entry_point = 'xblock.light_children'
     block_type = None
+    light_child_fields = {}
+    init_attributes_excluded = LIGHT_CHILD_INTERNALS
 
     def __init__(self, parent):
         self.parent = parent
@@ -243,6 +625,26 @@ class LightChild(Plugin, LightChildrenMixin):
     def runtime(self):
         return self.parent.runtime
 
+    def get_render_cache_key(self, view_name, context):
+        """
+        Key parts of the fragments of this child in `render_cache` - see `cached_fragment`. None
+        when the content of the container isn't known, to render without caching.
+        """
+        container = self.xblock_container
+        if container.xml_content_hash is None:
+            return None
+
+        path = []
+        block = self
+        while block is not container:
+            path.append(block.name)
+            block = block.parent
+        as_template = context.get(ContextConstants.AS_TEMPLATE, True) if context is not None else True
+        # The fragments rendered by another release (other templates or code) must not be used
+        return (PACKAGE_VERSION, container.__class__.__name__, container.name, container.xml_content_hash,
+                '/'.join(reversed(path)), view_name, as_template, container.get_course_id(),
+                container.text_rewriting_deferred)
+
     @property
     def xmodule_runtime(self):
         try:
@@ -262,29 +664,57 @@ class LightChild(Plugin, LightChildrenMixin):
         overwriting field values
         """
         if not self.name:
-            return ''
+            return {}
 
         student_data = self.get_lightchild_model_object().student_data
         return student_data
 
     def load_student_data(self):
         """
-        Load the student data from the database.
+        Load the student data from the database, once per instance.
         """
 
         if self._student_data_loaded:
             return
+        self._student_data_loaded = True
 
         fields = self.get_fields_to_save()
         if not fields or not self.student_data:
             return
 
-        student_data = json.loads(self.student_data)
         for field in fields:
-            if field in student_data:
-                setattr(self, field, student_data[field])
+            if field in self.student_data:
+                setattr(self, field, self.student_data[field])
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Field layout of the class, computed once from the declared fields
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, LightChildField):
+                    fields[name] = value
+        cls.light_child_fields = fields
+        # Values of the student state fields are not part of the content of the light child
+        cls.init_attributes_excluded = LIGHT_CHILD_INTERNALS | frozenset(
+            name for name, field in fields.items() if field.scope == Scope.user_state)
+
+    def get_init_attributes(self):
+        """
+        Returns the (name, value) pairs set on this light child when it was built from its
+        XML node, which is enough to build an identical light child, see `build_light_children()`
+        """
+        excluded = self.init_attributes_excluded
+        return tuple((name, value) for name, value in vars(self).items() if name not in excluded)
 
-        self._student_data_loaded = True
+    @classmethod
+    def get_answer_names(cls, attrs):
+        """
+        Names of the Answer model objects read by a light child of this class built with the
+        attributes `attrs`, so they can be fetched along with the other answers of the block
+        """
+        return ()
 
     @classmethod
     def get_fields_to_save(cls):
@@ -310,9 +740,10 @@ class LightChild(Plugin, LightChildrenMixin):
 
         if self.name:
             lightchild_data = self.get_lightchild_model_object()
+            # Only write when a value changed
             if lightchild_data.student_data != self.student_data:
-                lightchild_data.student_data = json.dumps(self.student_data)
-                lightchild_data.save()
+                lightchild_data.student_data = self.student_data
+                self.xblock_container.save_model_object(lightchild_data, ['student_data'])
 
     def get_lightchild_model_object(self, name=None):
         """
@@ -329,35 +760,107 @@ class LightChild(Plugin, LightChildrenMixin):
         course_id = self.xmodule_runtime.course_id
         url_name = "{}-{}".format(self.xblock_container.url_name, name)
 
-        lightchild_data, _ = LightChildModel.objects.get_or_create(
-            student_id=student_id,
-            course_id=course_id,
-            name=url_name,
-        )
+        # Rows of the whole block are prefetched at once by the container
+        prefetched = self.xblock_container.get_lightchild_data(student_id, course_id)
+        lightchild_data = prefetched.get(url_name)
+        if lightchild_data is None:
+            if name not in self.xblock_container.get_light_children_names():
+                # Not one of the light children of the block, so it wasn't prefetched
+                lightchild_data = LightChildModel.objects.filter(
+                    student_id=student_id,
+                    course_id=course_id,
+                    name=url_name,
+                ).first()
+            if lightchild_data is None:
+                # The row doesn't exist yet - it is only created when the student data is saved
+                lightchild_data = LightChildModel(student_id=student_id, course_id=course_id, name=url_name)
+            prefetched[url_name] = lightchild_data
         return lightchild_data
 
     def local_resource_url(self, block, uri):
         return self.runtime.local_resource_url(block, uri, block_type=self.block_type)
 
 
+class LightChildRegistry:
+    """
+    Light child classes by XML tag, from the `xblock.light_children` entry points
+
+    The entry points are all loaded at once, the first time a class or a tag is looked up (they
+    can't be loaded when this module is imported, the light child modules import it), instead of
+    going through `LightChild.load_class()` for each XML element. Call `reload()` after changing
+    the installed plugins, eg. in tests.
+    """
+
+    def __init__(self, plugin_class):
+        self.plugin_class = plugin_class
+        self._classes = None
+        self._tags = None
+
+    def load(self):
+        classes = {}
+        tags = {}
+        for tag, cls in self.plugin_class.load_classes():
+            tag = tag.lower()
+            if tag in classes:
+                log.warning('Several light child classes for <%s>, using %r', tag, classes[tag])
+                continue
+            classes[tag] = cls
+            tags.setdefault(cls, tag)
+        self._classes, self._tags = classes, tags
+
+    def reload(self):
+        self._classes = self._tags = None
+
+    def get_class(self, tag):
+        """
+        Returns the light child class of the XML tag `tag`
+        """
+        if self._classes is None:
+            self.load()
+        try:
+            return self._classes[tag.lower()]
+        except KeyError:
+            raise PluginMissingError(tag)
+
+    def get_tag(self, cls):
+        """
+        Returns the XML tag of the light child class `cls` - the first one, for classes with aliases
+        """
+        if self._tags is None:
+            self.load()
+        return self._tags[cls]
+
+
+light_child_registry = LightChildRegistry(LightChild)
+
+
 class LightChildField:
     """
     Fake field with no persistence - allows to keep XBlocks fields definitions on LightChild
+
+    Values are stored in the `__dict__` of the light child, under the name of the field.
+    Only fields with a `Scope.user_state` scope depend on the student data.
     """
 
     def __init__(self, *args, **kwargs):
         self.default = kwargs.get('default', '')
-        self.data = WeakKeyDictionary()
+        self.scope = kwargs.get('scope', Scope.content)
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
 
-    def __get__(self, instance, name):
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
 
-        # A LightChildField can depend on student_data
-        instance.load_student_data()
+        if self.scope == Scope.user_state:
+            instance.load_student_data()
 
-        return self.data.get(instance, self.default)
+        return instance.__dict__.get(self.name, self.default)
 
     def __set__(self, instance, value):
-        self.data[instance] = value
+        instance.__dict__[self.name] = value
 
 
 class String(LightChildField):
@@ -376,9 +879,9 @@ class Integer(LightChildField):
 
     def __set__(self, instance, value):
         try:
-            self.data[instance] = int(value)
+            instance.__dict__[self.name] = int(value)
         except (TypeError, ValueError):  # not an integer
-            self.data[instance] = 0
+            instance.__dict__[self.name] = 0
 
 
 class Boolean(LightChildField):
@@ -390,7 +893,7 @@ class Boolean(LightChildField):
         if isinstance(value, str):
             value = value.lower() == 'true'
 
-        self.data[instance] = value
+        instance.__dict__[self.name] = value
 
 
 class Float(LightChildField):
@@ -400,9 +903,9 @@ class Float(LightChildField):
 
     def __set__(self, instance, value):
         try:
-            self.data[instance] = float(value)
+            instance.__dict__[self.name] = float(value)
         except (TypeError, ValueError):  # not an integer
-            self.data[instance] = 0
+            instance.__dict__[self.name] = 0
 
 
 class List(LightChildField):
@@ -412,5 +915,5 @@ class List(LightChildField):
 
 
 class Scope:
-    content = None
-    user_state = None
+    content = 'content'
+    user_state = 'user_state'
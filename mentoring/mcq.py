@@ -26,7 +26,6 @@ import logging
 
 from .light_children import Scope, String
 from .questionnaire import QuestionnaireAbstractBlock
-from .utils import loader
 
 # Globals ###########################################################
 
@@ -58,32 +57,16 @@ class MCQBlock(QuestionnaireAbstractBlock):
         return self.calculate_results(previous_result['submission'])
 
     def calculate_results(self, submission):
-        correct = True
-        tips_fragments = []
-        for tip in self.get_tips():
-            correct = correct and self.is_tip_correct(tip, submission)
-            if submission in tip.display_with_defaults:
-                tips_fragments.append(tip.render())
-
-        formatted_tips = loader.render_template('templates/html/tip_choice_group.html', {
-            'self': self,
-            'tips_fragments': tips_fragments,
-            'completed': correct,
-        })
-
-        return {
+        rules = self.tip_rules
+        if self.get_tips():
+            correct = bool(submission) and submission not in rules.rejected
+        else:
+            correct = True
+        result = {
             'submission': submission,
             'status': 'correct' if correct else 'incorrect',
-            'tips': formatted_tips,
             'weight': self.weight,
             'score': 1 if correct else 0,
         }
-
-    def is_tip_correct(self, tip, submission):
-        if not submission:
-            return False
-
-        if submission in tip.reject_with_defaults:
-            return False
-
-        return True
+        result.update(self.get_tips_result(self.get_tips_to_display(submission), correct))
+        return result
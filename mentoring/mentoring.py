@@ -30,6 +30,7 @@ import uuid
 from collections import namedtuple
 from io import StringIO
 
+from lazy import lazy
 from lxml import etree
 from xblock.core import XBlock
 from xblock.fields import Boolean, Float, Integer, List, Scope, String
@@ -46,6 +47,8 @@ from .utils import loader
 
 log = logging.getLogger(__name__)
 
+# Children of a mentoring block by role - see `MentoringBlock.child_roles`
+ChildRoles = namedtuple('ChildRoles', ['title', 'header', 'messages', 'steps', 'floating', 'renderable'])
 
 DEFAULT_XML_CONTENT = textwrap.dedent("""
 <mentoring url_name="{url_name}" display_name="Nav tooltip title" weight="1" mode="standard">
@@ -154,6 +157,8 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
     display_submit = Boolean(help="Allow submission of the current block?", default=True,
                              scope=Scope.content, enforce_type=True)
     xml_content = String(help="XML content", default=DEFAULT_XML_CONTENT, scope=Scope.content)
+    compiled_content = String(help="Compiled form of the XML content, generated when it is saved from Studio",
+                              default='', scope=Scope.content)
     weight = Float(help="Defines the maximum total grade of the block.",
                    default=1, scope=Scope.content, enforce_type=True)
     num_attempts = Integer(help="Number of attempts a user has answered for this questions",
@@ -179,6 +184,8 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
 
     FIELDS_TO_INIT = ('xml_content',)
 
+    LAZY_LIGHT_CHILDREN = True
+
     @property
     def is_assessment(self):
         return self.mode == 'assessment'
@@ -187,10 +194,10 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
         """
         Get the step number of the question id
         """
-        for question in self.get_children_objects():
-            if hasattr(question, 'step_number') and (question.name == question_id):
-                return question.step_number
-        raise ValueError("Question ID in answer set not a step of this Mentoring Block!")
+        try:
+            return self.step_index.numbers_by_name[question_id]
+        except KeyError:
+            raise ValueError("Question ID in answer set not a step of this Mentoring Block!")
 
     def answer_mapper(self, answer_status):
         """
@@ -209,9 +216,13 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
                     pass
         return answer_map
 
-    @property
+    @lazy
     def score(self):
-        """Compute the student score taking into account the light child weight."""
+        """
+        Compute the student score taking into account the light child weight.
+
+        Computed once per request - call `invalidate_score()` after changing `student_results`.
+        """
         total_child_weight = sum(float(step.weight) for step in self.steps)
         if total_child_weight == 0:
             return Score(0, 0, [], [], [])
@@ -228,6 +239,9 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
 
         return Score(score, int(round(score * 100)), correct, incorrect, partially_correct)
 
+    def invalidate_score(self):
+        lazy.invalidate(self, 'score')
+
     @property
     def assessment_message(self):
         if not self.max_attempts_reached:
@@ -259,20 +273,22 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
         self.migrate_fields()
 
         # Validate self.step:
-        num_steps = len([child for child in self.get_children_objects() if not isinstance(child, self.FLOATING_BLOCKS)])
+        num_steps = len(self.child_roles.renderable)
         if self.step > num_steps:
             self.step = num_steps
 
-        fragment, named_children = self.get_children_fragment(
-            context, view_name='mentoring_view',
-            not_instance_of=self.FLOATING_BLOCKS,
-        )
-
-        fragment.add_content(loader.render_template('templates/html/mentoring.html', {
-            'self': self,
-            'named_children': named_children,
-            'missing_dependency_url': self.has_missing_dependency and self.next_step_url,
-        }))
+        # The `/jump_to_id` URLs of the children are rewritten in a single pass over the page
+        with self.deferred_text_rewriting():
+            fragment, named_children = self.get_children_fragment(
+                context, view_name='mentoring_view',
+                children=self.child_roles.renderable,
+            )
+
+            fragment.add_content(loader.render_template('templates/html/mentoring.html', {
+                'self': self,
+                'named_children': named_children,
+                'missing_dependency_url': self.has_missing_dependency and self.next_step_url,
+            }))
         fragment.add_css_url(self.runtime.local_resource_url(self, 'public/css/mentoring.css'))
         fragment.add_javascript_url(
             self.runtime.local_resource_url(self, 'public/js/vendor/underscore-min.js'))
@@ -290,7 +306,7 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
         if not self.display_submit:
             self.runtime.publish(self, 'progress', {})
 
-        return fragment
+        return self.fragment_text_rewriting(fragment)
 
     def migrate_fields(self):
         """
@@ -303,6 +319,7 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
             for result in self.student_results:
                 result[1]['status'] = CORRECT if result[1]['completed'] else INCORRECT
                 del result[1]['completed']
+            self.invalidate_score()
 
     @property
     def additional_publish_event_data(self):
@@ -311,25 +328,41 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
             'component_id': self.url_name,
         }
 
+    @lazy
+    def child_roles(self):
+        """
+        Index of the children by role, built in a single pass over the children
+        """
+        title = header = None
+        messages = {}
+        floating = []
+        renderable = []
+        for child in self.get_children_objects():
+            if not isinstance(child, self.FLOATING_BLOCKS):
+                renderable.append(child)
+                continue
+            floating.append(child)
+            if isinstance(child, TitleBlock):
+                title = title or child
+            elif isinstance(child, SharedHeaderBlock):
+                header = header or child
+            elif isinstance(child, MentoringMessageBlock):
+                messages.setdefault(child.type, child)
+        return ChildRoles(title, header, messages, self.steps, floating, renderable)
+
     @property
     def title(self):
         """
         Returns the title child.
         """
-        for child in self.get_children_objects():
-            if isinstance(child, TitleBlock):
-                return child
-        return None
+        return self.child_roles.title
 
     @property
     def header(self):
         """
         Return the header child.
         """
-        for child in self.get_children_objects():
-            if isinstance(child, SharedHeaderBlock):
-                return child
-        return None
+        return self.child_roles.header
 
     @property
     def has_missing_dependency(self):
@@ -410,13 +443,14 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
 
         submit_results = []
         completed = True
-        for child in self.get_children_objects():
-            if child.name and child.name in submissions:
-                submission = submissions[child.name]
-                child_result = child.submit(submission)
-                submit_results.append([child.name, child_result])
-                child.save()
-                completed = completed and (child_result['status'] == CORRECT)
+        with self.unit_of_work():
+            for child in self.get_children_objects():
+                if child.name and child.name in submissions:
+                    submission = submissions[child.name]
+                    child_result = child.submit(submission)
+                    submit_results.append([child.name, child_result])
+                    child.save()
+                    completed = completed and (child_result['status'] == CORRECT)
 
         message = self.get_message(completed)
 
@@ -441,6 +475,7 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
                 self.student_results.pop()
             for result in submit_results:
                 self.student_results.append(result)
+            self.invalidate_score()
 
             self.runtime.publish(self, 'grade', {
                 'value': self.score.raw,
@@ -472,35 +507,36 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
     def handleAssessmentSubmit(self, submissions, suffix):
         completed = False
         current_child = None
-        children = [child for child in self.get_children_objects()
-                    if not isinstance(child, self.FLOATING_BLOCKS)]
+        children = self.child_roles.renderable
 
         assessment_message = None
 
-        for child in children:
-            if child.name and child.name in submissions:
-                submission = submissions[child.name]
-
-                # Assessment mode doesn't allow to modify answers
-                # This will get the student back at the step he should be
-                current_child = child
-                step = children.index(child)
-                if self.step > step or self.max_attempts_reached:
-                    step = self.step
-                    completed = False
-                    break
-
-                self.step = step + 1
-
-                child_result = child.submit(submission)
-                if 'tips' in child_result:
-                    del child_result['tips']
-                self.student_results.append([child.name, child_result])
-                child.save()
-                completed = child_result['status']
+        with self.unit_of_work():
+            for child in children:
+                if child.name and child.name in submissions:
+                    submission = submissions[child.name]
+
+                    # Assessment mode doesn't allow to modify answers
+                    # This will get the student back at the step he should be
+                    current_child = child
+                    step = children.index(child)
+                    if self.step > step or self.max_attempts_reached:
+                        step = self.step
+                        completed = False
+                        break
+
+                    self.step = step + 1
+
+                    child_result = child.submit(submission)
+                    child_result.pop('tips', None)
+                    child_result.pop('tip_ids', None)
+                    self.student_results.append([child.name, child_result])
+                    child.save()
+                    completed = child_result['status']
 
         event_data = {}
 
+        self.invalidate_score()
         score = self.score
 
         if current_child == self.steps[-1]:
@@ -555,6 +591,7 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
 
         while self.student_results:
             self.student_results.pop()
+        self.invalidate_score()
 
         return {
             'result': 'success'
@@ -564,11 +601,30 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
     def max_attempts_reached(self):
         return self.max_attempts > 0 and self.num_attempts >= self.max_attempts
 
+    @property
+    def messages_by_type(self):
+        """
+        Message children by type - the first one of the content for each type
+        """
+        return self.child_roles.messages
+
+    @lazy
+    def message_fragments(self):
+        """
+        Rendered message fragments by type, filled by `get_message_fragment()` - once per request
+        """
+        return {}
+
     def get_message_fragment(self, message_type):
-        for child in self.get_children_objects():
-            if isinstance(child, MentoringMessageBlock) and child.type == message_type:
+        if message_type not in self.message_fragments:
+            child = self.messages_by_type.get(message_type)
+            frag = None
+            if child is not None:
                 frag = self.render_child(child, 'mentoring_view', {})
-                return self.fragment_text_rewriting(frag)
+                # Messages are also embedded escaped in attributes, out of reach of a later pass
+                frag = self.fragment_text_rewriting(frag, deferrable=False)
+            self.message_fragments[message_type] = frag
+        return self.message_fragments[message_type]
 
     def get_message_html(self, message_type):
         fragment = self.get_message_fragment(message_type)
@@ -627,6 +683,7 @@ class MentoringBlock(XBlockWithLightChildren, StepParentMixin):
                     'result': 'success',
                 }
                 self.xml_content = etree.tostring(content, encoding='unicode', pretty_print=True)
+                self.compiled_content = self.compile_xml_content()
 
         log.debug('Response from Studio: {}'.format(response))
         return response
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Replace the single-column indexes by composite indexes matching the queries. The unique
+    indexes serve the lookups of a student's data, and the Answer one - on (course_id, student_id,
+    name) - the data export of a course, along with the new (course_id, name) index.
+    """
+
+    dependencies = [
+        ('mentoring', '0005_auto__chg_field_lightchild_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='answer',
+            name='name',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='answer',
+            name='student_id',
+            field=models.CharField(max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='answer',
+            name='course_id',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['course_id', 'name'], name='mentoring_ans_crs_name'),
+        ),
+        migrations.AlterField(
+            model_name='lightchild',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='lightchild',
+            name='student_id',
+            field=models.CharField(max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='lightchild',
+            name='course_id',
+            field=models.CharField(max_length=50),
+        ),
+    ]
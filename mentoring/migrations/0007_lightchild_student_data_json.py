@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+from django.db import migrations
+
+import mentoring.models
+
+
+class Migration(migrations.Migration):
+    """
+    Store the LightChild student data with a JSON field. The column stays a text column holding
+    the same JSON, so the existing rows don't need to be converted.
+    """
+
+    dependencies = [
+        ('mentoring', '0006_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lightchild',
+            name='student_data',
+            field=mentoring.models.JSONField(blank=True, default=dict),
+        ),
+    ]
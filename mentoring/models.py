@@ -22,12 +22,63 @@
 
 # Imports ###########################################################
 
+import json
+
+from django.core.exceptions import ValidationError
 from django.db import models
 
 # Classes ###########################################################
 
 
-class Answer(models.Model):
+class JSONField(models.TextField):
+    """
+    Text field holding a JSON serializable value, loaded and dumped by the field itself. The
+    column stays a text column - Django only has a native JSONField starting with 3.1.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        return self.to_python(value)
+
+    def to_python(self, value):
+        if not isinstance(value, str):
+            return value
+        # Rows written before the field was a JSON field may be empty
+        if not value:
+            return self.get_default()
+        return json.loads(value)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return json.dumps(value)
+
+    def value_to_string(self, obj):
+        return self.get_prep_value(self.value_from_object(obj))
+
+
+class LengthValidationMixin:
+    """
+    Cheap validation of the model fields, for the write paths which can't afford `full_clean()`
+    """
+
+    def validate_lengths(self, field_names=None):
+        """
+        Check the `max_length` of the fields named `field_names` - all the fields by default -
+        without querying the database. Raises a ValidationError like `full_clean()` does.
+        """
+        errors = {}
+        for field in self._meta.concrete_fields:
+            if field.max_length is None or (field_names is not None and field.name not in field_names):
+                continue
+            try:
+                field.run_validators(getattr(self, field.attname))
+            except ValidationError as e:
+                errors[field.name] = e.error_list
+        if errors:
+            raise ValidationError(errors)
+
+
+class Answer(LengthValidationMixin, models.Model):
     """
     Django model used to store AnswerBlock data that need to be shared
     and queried accross XBlock instances (workaround).
@@ -35,22 +86,33 @@ class Answer(models.Model):
 
     class Meta:
         app_label = 'mentoring'
-        unique_together = (('student_id', 'course_id', 'name'),)
+        # The unique index serves the lookups of a student's answers, and the answers of a course
+        # ordered by student for the data export. The other index lists the answer names of a course.
+        unique_together = (('course_id', 'student_id', 'name'),)
+        indexes = [
+            models.Index(fields=['course_id', 'name'], name='mentoring_ans_crs_name'),
+        ]
 
-    name = models.CharField(max_length=50, db_index=True)
-    student_id = models.CharField(max_length=32, db_index=True)
-    course_id = models.CharField(max_length=50, db_index=True)
+    name = models.CharField(max_length=50)
+    student_id = models.CharField(max_length=32)
+    course_id = models.CharField(max_length=50)
     student_input = models.TextField(blank=True, default='')
     created_on = models.DateTimeField('created on', auto_now_add=True)
     modified_on = models.DateTimeField('modified on', auto_now=True)
 
-    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
-        # Force validation of max_length
-        self.full_clean()
+    def save(self, *args, strict=False, **kwargs):  # pylint: disable=arguments-differ
+        """
+        Save the answer, validating the length of the fields first. With `strict`, the complete
+        model validation runs instead, including the unique check, which queries the database.
+        """
+        if strict:
+            self.full_clean()
+        else:
+            self.validate_lengths(kwargs.get('update_fields'))
         super().save(*args, **kwargs)
 
 
-class LightChild(models.Model):
+class LightChild(LengthValidationMixin, models.Model):
     """
     Django model used to store LightChild student data that need to be shared and queried accross
     XBlock instances (workaround). Since this is temporary, `data` are stored in json.
@@ -58,11 +120,12 @@ class LightChild(models.Model):
 
     class Meta:
         app_label = 'mentoring'
+        # Only queried by (student_id, course_id, name), through the unique index
         unique_together = (('student_id', 'course_id', 'name'),)
 
-    name = models.CharField(max_length=100, db_index=True)
-    student_id = models.CharField(max_length=32, db_index=True)
-    course_id = models.CharField(max_length=50, db_index=True)
-    student_data = models.TextField(blank=True, default='')
+    name = models.CharField(max_length=100)
+    student_id = models.CharField(max_length=32)
+    course_id = models.CharField(max_length=50)
+    student_data = JSONField(blank=True, default=dict)
     created_on = models.DateTimeField('created on', auto_now_add=True)
     modified_on = models.DateTimeField('modified on', auto_now=True)
@@ -26,7 +26,6 @@ import logging
 
 from .light_children import Boolean, List, Scope
 from .questionnaire import QuestionnaireAbstractBlock
-from .utils import loader
 
 # Globals ###########################################################
 
@@ -65,18 +64,12 @@ class MRQBlock(QuestionnaireAbstractBlock):
         """
         score = 0
         results = []
+        rules = self.tip_rules
+        selected = set(submissions)
+        incomplete = (rules.required - selected) | (rules.rejected & selected)
         for choice in self.custom_choices:
-            choice_completed = True
-            choice_tips_fragments = []
-            choice_selected = choice.value in submissions
-            for tip in self.get_tips():
-                if choice.value in tip.display_with_defaults:
-                    choice_tips_fragments.append(tip.render())
-
-                if ((not choice_selected and choice.value in tip.require_with_defaults) or
-                        (choice_selected and choice.value in tip.reject_with_defaults)):
-                    choice_completed = False
-
+            choice_completed = choice.value not in incomplete
+            choice_selected = choice.value in selected
             if choice_completed:
                 score += 1
 
@@ -87,11 +80,7 @@ class MRQBlock(QuestionnaireAbstractBlock):
             # Only include tips/results in returned response if we want to display them
             if not self.hide_results:
                 choice_result['completed'] = choice_completed
-                choice_result['tips'] = loader.render_template('templates/html/tip_choice_group.html', {
-                    'self': self,
-                    'tips_fragments': choice_tips_fragments,
-                    'completed': choice_completed,
-                })
+                choice_result.update(self.get_tips_result(self.get_tips_to_display(choice.value), choice_completed))
 
             results.append(choice_result)
 
@@ -68,6 +68,15 @@ function MessageView(element, mentoring) {
     };
 }
 
+function renderTips(element, tipIds) {
+    // Tips included in the page by questionnaires with `client_side_tips` enabled
+    var html = '<div class="tip-choice-group">';
+    $.each(tipIds, function(index, tipId) {
+        html += $('.tip-templates .tip-template[data-tip-id="' + tipId + '"]', element).html();
+    });
+    return html + '</div><div class="close icon-remove-sign fa fa-times-circle"></div>';
+}
+
 function MCQBlock(runtime, element, mentoring) {
     return {
         mode: null,
@@ -96,6 +105,10 @@ function MCQBlock(runtime, element, mentoring) {
             var messageView = MessageView(element, mentoring);
             messageView.clearResult();
 
+            if (result.tip_ids) {
+                result.tips = renderTips(element, result.tip_ids);
+            }
+
             var choiceInputs = $('.choice input', element);
             $.each(choiceInputs, function(index, choiceInput) {
                 var choiceInputDOM = $(choiceInput);
@@ -182,6 +195,9 @@ function MRQBlock(runtime, element, mentoring) {
                 var choiceDOM = choiceInputDOM.closest('.choice');
                 var choiceResultDOM = $('.choice-result', choiceDOM);
                 var choiceTipsDOM = $('.choice-tips', choiceDOM);
+                if (choice.tip_ids) {
+                    choice.tips = renderTips(element, choice.tip_ids);
+                }
                 /* show hint if checked or max_attempts is disabled */
                 if (!hide_results &&
                     (result.completed || choiceInputDOM.prop('checked') || options.max_attempts <= 0)) {
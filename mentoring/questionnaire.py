@@ -24,6 +24,7 @@
 
 import logging
 import uuid
+from collections import namedtuple
 
 from lazy import lazy
 from xblock.fragment import Fragment
@@ -38,6 +39,9 @@ from .utils import ContextConstants, loader
 
 log = logging.getLogger(__name__)
 
+# Tips to display by choice value, and choices required/rejected by any of the tips
+TipRules = namedtuple('TipRules', ['display', 'required', 'rejected'])
+
 
 # Classes ###########################################################
 
@@ -55,6 +59,8 @@ class QuestionnaireAbstractBlock(LightChild, StepMixin):
     message = String(help="General feedback provided when submiting", scope=Scope.content, default="")
     weight = Float(help="Defines the maximum total grade of the light child block.",
                    default=1, scope=Scope.content, enforce_type=True)
+    client_side_tips = Boolean(help="Include the tips in the page, and only return the ids of the tips to "
+                                    "display on submit", default=False, scope=Scope.content)
 
     valid_types = ('choices')
 
@@ -86,13 +92,13 @@ class QuestionnaireAbstractBlock(LightChild, StepMixin):
         render_function = loader.custom_render_js_template if as_template else loader.render_template
         html = render_function(template_path, {
             'self': self,
-            'custom_choices': self.custom_choices
+            'custom_choices': self.custom_choices,
+            'tip_templates': self.render_tip_templates() if self.client_side_tips else '',
         })
 
         fragment = Fragment(html)
-        fragment.add_css(loader.render_template('public/css/questionnaire.css', {
-            'self': self
-        }))
+        fragment.add_css_url(self.runtime.local_resource_url(self.xblock_container,
+                                                             'public/css/questionnaire.css'))
         fragment.add_javascript_url(self.runtime.local_resource_url(self.xblock_container,
                                                                     'public/js/questionnaire.js'))
         fragment.initialize_js(name)
@@ -119,6 +125,49 @@ class QuestionnaireAbstractBlock(LightChild, StepMixin):
                 tips.append(child)
         return tips
 
+    @lazy
+    def tip_rules(self):
+        """
+        Rules of the tips, built once per block from their `display`/`require`/`reject` choices
+        """
+        display = {}
+        required = set()
+        rejected = set()
+        for tip in self.get_tips():
+            for value in tip.display_with_defaults:
+                display.setdefault(value, []).append(tip)
+            required |= tip.require_with_defaults
+            rejected |= tip.reject_with_defaults
+        return TipRules(display, frozenset(required), frozenset(rejected))
+
+    def render_tip_templates(self):
+        """
+        HTML of all the tips, keyed by tip id, for the client to display them when `client_side_tips`
+        is enabled
+        """
+        return loader.render_template('templates/html/tip_templates.html', {
+            'tips': self.get_tips(),
+        })
+
+    def get_tips_result(self, tips, completed):
+        """
+        Tips part of a submission result: the ids of the `tips` when they are displayed by the client,
+        their rendered HTML otherwise
+        """
+        if self.client_side_tips:
+            return {'tip_ids': [tip.name for tip in tips]}
+        return {'tips': loader.render_template('templates/html/tip_choice_group.html', {
+            'self': self,
+            'tips_fragments': [tip.render() for tip in tips],
+            'completed': completed,
+        })}
+
+    def get_tips_to_display(self, value):
+        """
+        Returns the tips to display for the choice `value`, in the order of the content
+        """
+        return self.tip_rules.display.get(value, [])
+
     def get_submission_display(self, submission):
         """
         Get the human-readable version of a submission value
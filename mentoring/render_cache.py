@@ -0,0 +1,160 @@
+#
+# Copyright (C) 2014 Harvard
+#
+# Authors:
+#          Xavier Antoviaque <xavier@antoviaque.org>
+#
+# This software's license gives you freedom; you can copy, convey,
+# propagate, redistribute and/or modify this program under the terms of
+# the GNU Affero General Public License (AGPL) as published by the Free
+# Software Foundation (FSF), either version 3 of the License, or (at your
+# option) any later version of the AGPL published by the FSF.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Affero
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program in a file in the toplevel directory called
+# "AGPLv3".  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+# Imports ###########################################################
+
+import functools
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from xblock.fragment import Fragment
+
+from .utils import LRUCache
+
+# Globals ###########################################################
+
+log = logging.getLogger(__name__)
+
+RENDER_CACHE_SIZE = 1024
+
+
+# Classes ###########################################################
+
+class LocalMemoryRenderCacheBackend:
+    """
+    Keeps the rendered fragments in the memory of the process
+    """
+
+    def __init__(self, maxsize=RENDER_CACHE_SIZE):
+        self.cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class DjangoRenderCacheBackend:
+    """
+    Keeps the rendered fragments in one of the caches of Django's cache framework, to share them
+    between processes
+    """
+
+    def __init__(self, alias='default', timeout=None):
+        self.alias = alias
+        self.timeout = timeout
+
+    def get(self, key):
+        return caches[self.alias].get(key)
+
+    def set(self, key, value):
+        caches[self.alias].set(key, value, self.timeout)
+
+    def clear(self):
+        # Don't flush a cache which may be shared with the rest of the platform, the entries
+        # become unreachable as soon as the content changes anyway
+        pass
+
+
+class RenderCache:
+    """
+    Cache of the fragments rendered by the light children which only depend on the authored
+    content, never on the student state.
+
+    The backend is a `LocalMemoryRenderCacheBackend`, unless the `MENTORING_RENDER_CACHE` Django
+    setting names a cache of Django's cache framework, eg.
+
+        MENTORING_RENDER_CACHE = {'ALIAS': 'default', 'TIMEOUT': 3600}
+
+    Any object with `get(key)`, `set(key, value)` and `clear()` methods can also be assigned to
+    `render_cache.backend`.
+    """
+    KEY_PREFIX = 'mentoring.render'
+
+    def __init__(self, backend=None):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            config = getattr(settings, 'MENTORING_RENDER_CACHE', None)
+            if config:
+                self._backend = DjangoRenderCacheBackend(config.get('ALIAS', 'default'), config.get('TIMEOUT'))
+            else:
+                self._backend = LocalMemoryRenderCacheBackend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        self._backend = backend
+
+    def make_key(self, parts):
+        """
+        Cache key for a tuple of key parts, safe to use with any backend (short, no spaces)
+        """
+        digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+        return '{}:{}'.format(self.KEY_PREFIX, digest)
+
+    def get_fragment(self, parts):
+        data = self.backend.get(self.make_key(parts))
+        if data is None:
+            return None
+        return Fragment.from_dict(data)
+
+    def set_fragment(self, parts, fragment):
+        self.backend.set(self.make_key(parts), fragment.to_dict())
+
+    def clear(self):
+        self.backend.clear()
+
+
+render_cache = RenderCache()
+
+
+# Functions #########################################################
+
+def cached_fragment(method):
+    """
+    Decorator for the view/render methods of a light child, returning a fragment which only
+    depends on the authored content. The fragment is rendered once per content, view and course,
+    and a copy is returned from `render_cache` afterwards.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        context = args[0] if args else None
+        parts = self.get_render_cache_key(method.__name__, context)
+        if parts is None:
+            return method(self, *args)
+
+        fragment = render_cache.get_fragment(parts)
+        if fragment is None:
+            fragment = method(self, *args)
+            render_cache.set_fragment(parts, fragment)
+        return fragment
+    return wrapper
@@ -1,3 +1,11 @@
+from collections import namedtuple
+
+from lazy import lazy
+
+# Steps of a parent, with the step number of each step by identity and by name
+StepIndex = namedtuple('StepIndex', ['steps', 'numbers', 'numbers_by_name'])
+
+
 class StepParentMixin:
     """
     A parent containing the Step objects
@@ -5,18 +13,41 @@ class StepParentMixin:
     The parent must have a get_children_objects() method.
     """
 
+    @lazy
+    def step_index(self):
+        """
+        Index of the steps, built once from the children
+        """
+        steps = [child for child in self.get_children_objects() if isinstance(child, StepMixin)]
+        numbers = {}
+        numbers_by_name = {}
+        for number, step in enumerate(steps, 1):
+            numbers[id(step)] = number
+            numbers_by_name.setdefault(getattr(step, 'name', None), number)
+        return StepIndex(steps, numbers, numbers_by_name)
+
     @property
     def steps(self):
-        return [child for child in self.get_children_objects() if isinstance(child, StepMixin)]
+        return self.step_index.steps
+
+    @property
+    def step_count(self):
+        return len(self.step_index.steps)
+
+    def get_step_number(self, step):
+        try:
+            return self.step_index.numbers[id(step)]
+        except KeyError:
+            raise ValueError("Step's parent should contain Step", step, self.steps)
 
 
 class StepMixin:
     @property
     def step_number(self):
-        return self.parent.steps.index(self) + 1
+        return self.parent.get_step_number(self)
 
     @property
     def lonely_step(self):
-        if self not in self.parent.steps:
-            raise ValueError("Step's parent should contain Step", self, self.parents.steps)
-        return len(self.parent.steps) == 1
+        # Raises ValueError when the step isn't one of the parent's steps
+        self.parent.get_step_number(self)
+        return self.parent.step_count == 1
@@ -25,9 +25,7 @@
 import errno
 import logging
 
-from xblock.fields import Scope
-
-from .light_children import LightChild, String
+from .light_children import LightChild, Scope, String
 from .utils import loader
 
 # Globals ###########################################################
@@ -25,6 +25,7 @@
 import logging
 
 from .light_children import LightChild, Scope, String
+from .render_cache import cached_fragment
 from .utils import ContextConstants, loader
 
 # Globals ###########################################################
@@ -58,6 +59,7 @@ class TipBlock(LightChild):
     height = String(help="Height of the tip popup", scope=Scope.content, default='')
     has_children = True
 
+    @cached_fragment
     def render(self):
         """
         Returns a fragment containing the formatted tip
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2014 Harvard
+#
+# Authors:
+#          Xavier Antoviaque <xavier@antoviaque.org>
+#
+# This software's license gives you freedom; you can copy, convey,
+# propagate, redistribute and/or modify this program under the terms of
+# the GNU Affero General Public License (AGPL) as published by the Free
+# Software Foundation (FSF), either version 3 of the License, or (at your
+# option) any later version of the AGPL published by the FSF.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Affero
+# General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program in a file in the toplevel directory called
+# "AGPLv3".  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# Imports ###########################################################
+
+import logging
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+# Globals ###########################################################
+
+log = logging.getLogger(__name__)
+
+
+# Classes ###########################################################
+
+class UnitOfWork:
+    """
+    Collects the model objects (Answer, LightChild) modified while handling a request, to write
+    them all at the end with one bulk query per model and operation, in a single transaction.
+
+    Objects are identified by their (student_id, course_id, name) natural key, so registering
+    the same row twice only writes the last registered object.
+    """
+
+    def __init__(self):
+        self._objects = OrderedDict()
+        self._update_fields = {}
+
+    def __len__(self):
+        return len(self._objects)
+
+    def register(self, obj, update_fields):
+        """
+        Mark the model object `obj` as needing to be written. `update_fields` lists the fields
+        which were modified, when `obj` already exists in the database.
+        """
+        model = obj.__class__
+        self._objects[(model, obj.student_id, obj.course_id, obj.name)] = obj
+        self._update_fields.setdefault(model, set()).update(update_fields)
+
+    def flush(self):
+        """
+        Write all the registered objects
+        """
+        to_create = OrderedDict()
+        to_update = OrderedDict()
+        now = timezone.now()
+        for (model, _, _, _), obj in self._objects.items():
+            # Bulk queries bypass Model.save(), apply the same length validation
+            if obj.pk is None:
+                obj.validate_lengths()
+                to_create.setdefault(model, []).append(obj)
+            else:
+                obj.validate_lengths(self._update_fields[model])
+                # `auto_now` isn't applied by bulk_update()
+                obj.modified_on = now
+                to_update.setdefault(model, []).append(obj)
+
+        with transaction.atomic():
+            for model, objects in to_create.items():
+                self.create(model, objects)
+            for model, objects in to_update.items():
+                fields = sorted(self._update_fields[model] | {'modified_on'})
+                model.objects.bulk_update(objects, fields)
+
+        log.debug('Unit of work flushed: %d created, %d updated',
+                  sum(len(objects) for objects in to_create.values()),
+                  sum(len(objects) for objects in to_update.values()))
+        self._objects.clear()
+        self._update_fields.clear()
+
+    def create(self, model, objects):
+        """
+        Insert the new `objects` of `model` in bulk. The objects were read before the rows existed,
+        so another request may have created some of them since (double submit, second tab): on
+        conflict, each object is created or updated on its own instead.
+        """
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects)
+        except IntegrityError:
+            log.info('Conflict while creating %d %s rows, saving them one by one', len(objects), model.__name__)
+            for obj in objects:
+                saved, _ = model.objects.update_or_create(
+                    student_id=obj.student_id,
+                    course_id=obj.course_id,
+                    name=obj.name,
+                    defaults={field: getattr(obj, field) for field in self._update_fields[model]},
+                )
+                obj.pk = saved.pk
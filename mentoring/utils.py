@@ -21,32 +21,152 @@
 #
 
 import logging
+import threading
+from collections import OrderedDict
 from io import BytesIO as StringIO
 
+import pkg_resources
 import unicodecsv
+from django.template import Context, Engine, Template
+from django.template.backends.django import get_installed_libraries
 from xblock.fragment import Fragment
 from xblockutils.resources import ResourceLoader
 
 log = logging.getLogger(__name__)
 
+# Templates are cached by package version, so an upgrade never renders a stale template
+try:
+    PACKAGE_VERSION = pkg_resources.get_distribution('xblock-mentoring').version
+except pkg_resources.DistributionNotFound:
+    PACKAGE_VERSION = None
 
-class MentoringResourceLoader(ResourceLoader):
-    def custom_render_js_template(self, template_path, context=None):
-        return self.render_js_template(template_path, 'light-child-template', context)
+TEMPLATE_CACHE_SIZE = 128
 
 
-loader = MentoringResourceLoader(__name__)
+def add_unique_frag_resources(fragment, frag, seen):
+    """
+    Add the resources of `frag` to `fragment`, skipping the resources listed in the `seen` set,
+    which is updated - identical CSS/JS of sibling fragments is only included once
+    """
+    for resource in frag.resources:
+        if resource in seen:
+            continue
+        seen.add(resource)
+        if resource.kind == 'url':
+            fragment.add_resource_url(resource.data, resource.mimetype, resource.placement)
+        else:
+            fragment.add_resource(resource.data, resource.mimetype, resource.placement)
+
+
+class CSVRowWriter:
+    """
+    Converts lists to CSV strings (single rows), reusing the same buffer and writer for all the
+    rows of a file
+    """
+
+    def __init__(self):
+        self._buffer = StringIO()
+        self._writer = unicodecsv.writer(self._buffer, encoding='utf-8')
+
+    def __call__(self, row):
+        self._writer.writerow(row)
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return value
 
 
-def list2csv(row):
+class LRUCache:
     """
-    Convert a list to a CSV string (single row)
+    Bounded, thread-safe mapping which evicts the least recently used entry once more than
+    `maxsize` entries are stored. Keeps hit/miss/eviction counters to allow monitoring.
     """
-    f = StringIO()
-    writer = unicodecsv.writer(f, encoding='utf-8')
-    writer.writerow(row)
-    f.seek(0)
-    return f.read()
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drop all the entries and reset the counters
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+class MentoringResourceLoader(ResourceLoader):
+    """
+    Resource loader keeping the compiled Django templates in a process-level cache, keyed by
+    module, template path and package version, so a template is only read and parsed once
+    """
+    template_cache = LRUCache(maxsize=TEMPLATE_CACHE_SIZE)
+    _template_engine = None
+
+    @classmethod
+    def get_template_engine(cls):
+        if cls._template_engine is None:
+            libraries = get_installed_libraries()
+            libraries['i18n'] = 'xblockutils.templatetags.i18n'
+            cls._template_engine = Engine(libraries=libraries)
+        return cls._template_engine
+
+    def get_template(self, template_path):
+        key = (self.module_name, template_path, PACKAGE_VERSION)
+        template = self.template_cache.get(key)
+        if template is None:
+            template = Template(self.load_unicode(template_path), engine=self.get_template_engine())
+            self.template_cache.set(key, template)
+        return template
+
+    def render_django_template(self, template_path, context=None, i18n_service=None):
+        context = context or {}
+        context['_i18n_service'] = i18n_service
+        return self.get_template(template_path).render(Context(context))
+
+    def render_template(self, template_path, context=None):
+        return self.render_django_template(template_path, context)
+
+    def custom_render_js_template(self, template_path, context=None):
+        return self.render_js_template(template_path, 'light-child-template', context)
+
+
+loader = MentoringResourceLoader(__name__)
 
 
 class XBlockWithChildrenFragmentsMixin:
@@ -64,6 +184,7 @@ class XBlockWithChildrenFragmentsMixin:
         """
         fragment = Fragment()
         named_child_frags = []
+        seen_resources = set()
         for child_id in self.children:  # pylint: disable=E1101
             child = self.runtime.get_block(child_id)
             if instance_of is not None and not isinstance(child, instance_of):
@@ -71,7 +192,7 @@ class XBlockWithChildrenFragmentsMixin:
             if not_instance_of is not None and isinstance(child, not_instance_of):
                 continue
             frag = self.runtime.render_child(child, view_name, context)
-            fragment.add_frag_resources(frag)
+            add_unique_frag_resources(fragment, frag, seen_resources)
             named_child_frags.append((child.name, frag))
         return fragment, named_child_frags
 
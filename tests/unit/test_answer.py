@@ -0,0 +1,122 @@
+import unittest
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mock import MagicMock, Mock
+from xblock.field_data import DictFieldData
+
+from mentoring.answer import AnswerBlock
+from mentoring.light_children import compiled_children_cache, iter_light_children
+from mentoring.mentoring import MentoringBlock
+from mentoring.models import Answer
+
+
+@pytest.mark.django_db
+class TestAnswerStore(unittest.TestCase):
+    XML_CONTENT = (
+        '<mentoring url_name="store"><answer name="goal"/><answer name="new_goal" default_from="goal"/>'
+        '<mentoring-table type="goal"><column><header>Goals</header>{}</column></mentoring-table></mentoring>'
+    ).format(''.join('<answer name="goal_{}" read_only="true"/>'.format(i) for i in range(10)))
+
+    def setUp(self):
+        compiled_children_cache.clear()
+        for name, student_input in (('goal', 'Learn'), ('goal_3', 'Teach')):
+            Answer.objects.create(student_id='student1', course_id='sample-course', name=name,
+                                  student_input=student_input)
+
+    def make_block(self):
+        return MentoringBlock(MagicMock(), DictFieldData({'xml_content': self.XML_CONTENT}), Mock())
+
+    def get_answers(self, block):
+        return {
+            child.name: child.student_input
+            for child in iter_light_children(block.get_children_objects()) if isinstance(child, AnswerBlock)
+        }
+
+    def test_answers_are_fetched_with_one_query(self):
+        expected = {'goal_{}'.format(i): '' for i in range(10)}
+        expected.update({'goal': 'Learn', 'new_goal': 'Learn', 'goal_3': 'Teach'})
+        block = self.make_block()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_answers(block), expected)
+        self.assertEqual(len(queries), 1)
+
+    def test_answer_names(self):
+        expected = {'goal', 'new_goal'} | {'goal_{}'.format(i) for i in range(10)}
+        block = self.make_block()
+        self.assertEqual(block.get_answer_names(), expected)
+        # Without the compiled children, from the light children objects
+        block.compiled_children = None
+        self.assertEqual(block.get_answer_names(), expected)
+
+    def test_unreferenced_answer_is_fetched(self):
+        block = self.make_block()
+        store = block.get_answer_store('student1', 'sample-course')
+        self.assertIs(store.get('goal'), store.get('goal'))
+        with CaptureQueriesContext(connection) as queries:
+            answer = store.get('other')
+        self.assertEqual(len(queries), 1)
+        self.assertIsNone(answer.pk)
+        self.assertIs(store.get('other'), answer)
+
+
+@pytest.mark.django_db
+class TestAnswerModel(unittest.TestCase):
+    def make_answer(self, **fields):
+        fields = dict({'student_id': 'student1', 'course_id': 'sample-course', 'name': 'goal'}, **fields)
+        return Answer(**fields)
+
+    def count_save_queries(self, answer, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            answer.save(**kwargs)
+        return len(queries)
+
+    def test_save_does_not_query_for_validation(self):
+        answer = self.make_answer()
+        self.assertEqual(self.count_save_queries(answer), 1)
+        answer.student_input = 'Learn'
+        self.assertEqual(self.count_save_queries(answer), 1)
+        self.assertEqual(self.count_save_queries(answer, update_fields=['student_input']), 1)
+
+        # The unique check of the complete validation queries the database
+        self.assertEqual(self.count_save_queries(answer, strict=True), 2)
+        self.assertEqual(Answer.objects.get(name='goal').student_input, 'Learn')
+
+    def test_lengths_are_validated(self):
+        with self.assertRaises(ValidationError) as cm:
+            self.make_answer(student_input='x' * 1000, course_id='c' * 51).save()
+        self.assertEqual(list(cm.exception.message_dict), ['course_id'])
+
+        answer = self.make_answer()
+        answer.save()
+        answer.name = 'n' * 51
+        with self.assertRaises(ValidationError):
+            answer.save(update_fields=['name'])
+        # Fields which aren't saved aren't validated
+        answer.save(update_fields=['student_input'])
+        self.assertFalse(Answer.objects.exclude(name='goal').exists())
+
+    def test_strict_validation(self):
+        self.make_answer().save()
+        with self.assertRaises(ValidationError):
+            self.make_answer().save(strict=True)
+
+    def test_unit_of_work_validates_lengths(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        answer = self.make_answer()
+        answer.save()
+        answer.course_id = 'c' * 51
+        with CaptureQueriesContext(connection) as queries:
+            with block.unit_of_work():
+                block.save_model_object(answer, ['student_input'])
+        # Only the fields which are written are validated
+        self.assertEqual([query['sql'].split()[0] for query in queries if 'SAVEPOINT' not in query['sql']],
+                         ['UPDATE'])
+
+        with self.assertRaises(ValidationError):
+            with block.unit_of_work():
+                block.save_model_object(answer, ['course_id'])
+                block.save_model_object(self.make_answer(name='other'), ['student_input'])
+        self.assertEqual(Answer.objects.get().course_id, 'sample-course')
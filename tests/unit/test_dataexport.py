@@ -0,0 +1,56 @@
+import unittest
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mock import MagicMock, Mock
+from webob import Request
+from xblock.field_data import DictFieldData
+
+from mentoring.dataexport import MentoringDataExportBlock
+from mentoring.models import Answer
+
+
+@pytest.mark.django_db
+class TestDataExport(unittest.TestCase):
+    def setUp(self):
+        self.block = MentoringDataExportBlock(MagicMock(), DictFieldData({}), Mock())
+        self.block.xmodule_runtime = Mock(course_id='course')
+
+    def add_answers(self, student_id, **answers):
+        for name, student_input in answers.items():
+            Answer.objects.create(student_id=student_id, course_id='course', name=name, student_input=student_input)
+
+    def test_empty_export(self):
+        self.assertEqual(list(self.block.get_csv()), [b'student_id\r\n'])
+
+    def test_one_row_per_student(self):
+        self.add_answers('student2', goal='Be good', plan='Work')
+        self.add_answers('student1', goal='Go, go', mood='"Happy"')
+        self.add_answers('student3', plan='Nope')
+        Answer.objects.create(student_id='student1', course_id='other-course', name='other', student_input='No')
+
+        expected = [
+            b'student_id,goal,mood,plan\r\n',
+            b'student1,"Go, go","""Happy""",\r\n',
+            b'student2,Be good,,Work\r\n',
+            b'student3,,,Nope\r\n',
+        ]
+        self.assertEqual(list(self.block.get_csv()), expected)
+        self.assertEqual(list(self.block.get_csv(engine='database')), expected)
+
+    def test_engine_is_selected_from_handler(self):
+        self.add_answers('student1', goal='Goal')
+        response = self.block.download_csv(Request.blank('/?engine=database'))
+        self.assertEqual(response.body, b'student_id,goal\r\nstudent1,Goal\r\n')
+
+        response = self.block.download_csv(Request.blank('/?engine=unknown'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_depend_on_number_of_students(self):
+        for i in range(50):
+            self.add_answers('student{}'.format(i), goal='Goal', plan='Plan')
+        with CaptureQueriesContext(connection) as queries:
+            lines = list(self.block.get_csv())
+        self.assertEqual(len(lines), 51)
+        self.assertEqual(len(queries), 2)
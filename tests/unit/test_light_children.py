@@ -0,0 +1,352 @@
+import json
+import unittest
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from lxml import etree
+from mock import MagicMock, Mock, patch
+from webob import Request
+from xblock.field_data import DictFieldData
+from xblock.plugin import PluginMissingError
+
+from mentoring.light_children import COMPILED_CONTENT_VERSION, LightChild, compiled_children_cache, light_child_registry
+from mentoring.mcq import MCQBlock
+from mentoring.mentoring import MentoringBlock
+from mentoring.models import LightChild as LightChildModel
+from mentoring.mrq import MRQBlock
+from mentoring.tip import TipBlock
+
+
+def describe_tree(children):
+    return [
+        (child.__class__, child.name, child.get_init_attributes(), describe_tree(child.light_children))
+        for child in children
+    ]
+
+
+class TestCompiledChildrenCache(unittest.TestCase):
+    def setUp(self):
+        compiled_children_cache.clear()
+
+    def test_xml_content_is_parsed_once(self):
+        first = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        self.assertEqual(compiled_children_cache.misses, 1)
+        self.assertEqual(compiled_children_cache.hits, 0)
+
+        second = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        self.assertEqual(compiled_children_cache.misses, 1)
+        self.assertEqual(compiled_children_cache.hits, 1)
+
+        self.assertEqual(describe_tree(first.light_children), describe_tree(second.light_children))
+        self.assertEqual(second.mode, 'standard')
+        self.assertEqual(second.url_name, first.url_name)
+
+    def test_children_are_not_shared(self):
+        first = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        second = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+
+        first_mrq = [child for child in first.light_children if isinstance(child, MRQBlock)][0]
+        second_mrq = [child for child in second.light_children if isinstance(child, MRQBlock)][0]
+        self.assertIsNot(first_mrq, second_mrq)
+        self.assertIs(second_mrq.parent, second)
+        self.assertIs(second_mrq.get_tips()[0].xblock_container, second)
+
+        first_mrq.student_choices = ['elegance']
+        self.assertEqual(second_mrq.student_choices, [])
+
+    def test_content_change_is_a_miss(self):
+        MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        block = MentoringBlock(MagicMock(), DictFieldData({
+            'xml_content': '<mentoring mode="assessment"><html><p>Test</p></html></mentoring>',
+        }), Mock())
+        self.assertEqual(compiled_children_cache.misses, 2)
+        self.assertEqual(block.mode, 'assessment')
+
+    def test_least_recently_used_content_is_evicted(self):
+        maxsize = compiled_children_cache.maxsize
+        compiled_children_cache.maxsize = 1
+        try:
+            for content in ('<mentoring><html>1</html></mentoring>', '<mentoring><html>2</html></mentoring>'):
+                MentoringBlock(MagicMock(), DictFieldData({'xml_content': content}), Mock())
+        finally:
+            compiled_children_cache.maxsize = maxsize
+        self.assertEqual(compiled_children_cache.stats()['evictions'], 1)
+        self.assertEqual(len(compiled_children_cache), 1)
+
+
+class TestLazyLightChildren(unittest.TestCase):
+    XML_CONTENT = '<mentoring mode="assessment">{}</mentoring>'.format(''.join(
+        '<mcq name="mcq_{0}"><question>Q{0}</question><choice value="yes">Yes</choice>'
+        '<choice value="no">No</choice><tip display="yes">Good</tip><tip reject="no">Bad</tip></mcq>'.format(i)
+        for i in range(40)
+    ))
+
+    def setUp(self):
+        compiled_children_cache.clear()
+        # Parse the content once, so the block under test is built from the cache
+        self.make_block()
+
+    def make_block(self):
+        return MentoringBlock(MagicMock(), DictFieldData({'xml_content': self.XML_CONTENT}), Mock())
+
+    def test_try_again_does_not_build_children(self):
+        with patch.object(TipBlock, '__init__', side_effect=TipBlock.__init__, autospec=True) as tip_init:
+            block = self.make_block()
+            request = Request.blank('/', method='POST', body=b'{}')
+            response = block.try_again(request)
+
+        self.assertEqual(response.json, {'result': 'success'})
+        self.assertNotIn('light_children', vars(block))
+        self.assertFalse(tip_init.called)
+
+    def test_only_touched_subtrees_are_built(self):
+        block = self.make_block()
+        mcqs = block.get_children_objects()
+        self.assertEqual(len(mcqs), 40)
+        self.assertTrue(all(isinstance(mcq, MCQBlock) for mcq in mcqs))
+        self.assertFalse(any('light_children' in vars(mcq) for mcq in mcqs))
+
+        tips = mcqs[3].get_tips()
+        self.assertEqual([tip.display for tip in tips], ['yes', ''])
+        self.assertEqual([tip.reject for tip in tips], ['', 'no'])
+        self.assertIs(tips[0].parent, mcqs[3])
+        self.assertEqual(sum('light_children' in vars(mcq) for mcq in mcqs), 1)
+
+
+@pytest.mark.django_db
+class TestLightChildDataPrefetch(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(MCQBlock, 'get_fields_to_save', return_value=['student_choice'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_block(self, num_questions):
+        xml_content = '<mentoring url_name="prefetch">{}</mentoring>'.format(''.join(
+            '<mcq name="mcq_{0}"><choice value="yes">Yes</choice><tip display="yes">Good</tip></mcq>'.format(i)
+            for i in range(num_questions)
+        ))
+        return MentoringBlock(MagicMock(), DictFieldData({'xml_content': xml_content}), Mock())
+
+    def count_read_queries(self, num_questions):
+        for child in self.make_block(num_questions).get_children_objects():
+            child.student_choice = 'yes'
+            child.save()
+
+        block = self.make_block(num_questions)
+        with CaptureQueriesContext(connection) as queries:
+            for child in block.get_children_objects():
+                self.assertEqual(child.student_data, {'student_choice': 'yes'})
+                for grandchild in child.get_children_objects():
+                    self.assertEqual(grandchild.student_data, {})
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_number_of_questions(self):
+        self.assertEqual(self.count_read_queries(2), 1)
+        self.assertEqual(self.count_read_queries(20), 1)
+        self.assertEqual(LightChildModel.objects.filter(name__startswith='prefetch-').count(), 20)
+
+    def test_unchanged_data_is_not_written(self):
+        mcq = self.make_block(1).get_children_objects()[0]
+        mcq.student_choice = 'yes'
+        mcq.save()
+
+        mcq = self.make_block(1).get_children_objects()[0]
+        self.assertEqual(mcq.student_choice, 'yes')
+        with CaptureQueriesContext(connection) as queries:
+            mcq.save()
+            for tip in mcq.get_tips():
+                tip.save()
+        self.assertEqual(len(queries), 0)
+
+        mcq.student_choice = 'no'
+        with CaptureQueriesContext(connection) as queries:
+            mcq.save()
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('UPDATE'))
+        self.assertEqual(LightChildModel.objects.get(name='prefetch-mcq_0').student_data, {'student_choice': 'no'})
+
+    def test_legacy_rows(self):
+        LightChildModel.objects.create(student_id='student1', course_id='sample-course', name='prefetch-mcq_0')
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE mentoring_lightchild SET student_data = ''")
+        self.assertEqual(LightChildModel.objects.get(name='prefetch-mcq_0').student_data, {})
+        self.assertEqual(self.make_block(1).get_children_objects()[0].student_choice, '')
+
+    def test_rows_outside_of_the_block_are_fetched(self):
+        LightChildModel.objects.create(student_id='student1', course_id='sample-course', name='prefetch-other',
+                                       student_data={'student_choice': 'yes'})
+        mcq = self.make_block(2).get_children_objects()[0]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(mcq.get_lightchild_model_object('other').student_data, {'student_choice': 'yes'})
+            self.assertIsNone(mcq.get_lightchild_model_object('missing').pk)
+            self.assertIsNone(mcq.get_lightchild_model_object('mcq_1').pk)
+            mcq.get_lightchild_model_object('other')
+            mcq.get_lightchild_model_object('missing')
+        # The prefetch, then one query per name outside of the block
+        self.assertEqual(len(queries), 3)
+
+    def test_missing_rows_are_only_created_on_save(self):
+        block = self.make_block(3)
+        mcq = block.get_children_objects()[1]
+        lightchild_data = mcq.get_lightchild_model_object()
+        self.assertEqual(lightchild_data.name, 'prefetch-mcq_1')
+        self.assertIsNone(lightchild_data.pk)
+        self.assertFalse(LightChildModel.objects.filter(name='prefetch-mcq_1').exists())
+
+        mcq.student_choice = 'yes'
+        mcq.save()
+        self.assertIsNotNone(lightchild_data.pk)
+        self.assertTrue(LightChildModel.objects.filter(name='prefetch-mcq_1').exists())
+
+
+class TestLightChildFields(unittest.TestCase):
+    def test_values_are_stored_per_instance(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        first, second = TipBlock(block), TipBlock(block)
+        first.display = 'yes'
+        first.width = 100
+        self.assertEqual(first.display, 'yes')
+        self.assertEqual(second.display, '')
+        self.assertEqual(vars(first)['width'], 100)
+        self.assertNotIn('display', vars(second))
+
+    def test_field_layout(self):
+        self.assertEqual(sorted(TipBlock.light_child_fields),
+                         ['content', 'display', 'height', 'reject', 'require', 'width'])
+        self.assertIs(MCQBlock.light_child_fields['type'], vars(MCQBlock)['type'])
+        self.assertIs(MCQBlock.type, vars(MCQBlock)['type'])
+        self.assertEqual(MCQBlock.light_child_fields['question'].name, 'question')
+
+    def test_init_attributes_exclude_student_state(self):
+        self.assertIn('student_choice', MCQBlock.init_attributes_excluded)
+        self.assertNotIn('question', MCQBlock.init_attributes_excluded)
+
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        mcq = MCQBlock(block)
+        mcq.name = 'mcq'
+        mcq.question = 'Q?'
+        mcq.student_choice = 'yes'
+        self.assertEqual(mcq.get_init_attributes(), (('name', 'mcq'), ('question', 'Q?')))
+
+    def test_content_fields_do_not_load_student_data(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        tip = TipBlock(block)
+        tip.reject = 'no'
+        with patch.object(TipBlock, 'load_student_data') as load_student_data:
+            self.assertEqual(tip.reject, 'no')
+            self.assertEqual(tip.display, '')
+        self.assertFalse(load_student_data.called)
+
+    def test_user_state_fields_load_student_data_once(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        mcq = MCQBlock(block)
+        mcq.name = 'mcq'
+        lightchild_data = LightChildModel(student_data={'student_choice': 'yes'})
+        with patch.object(MCQBlock, 'get_fields_to_save', return_value=['student_choice']), \
+                patch.object(MCQBlock, 'get_lightchild_model_object', return_value=lightchild_data) as get_object:
+            self.assertEqual(mcq.student_choice, 'yes')
+            self.assertEqual(mcq.student_choice, 'yes')
+            self.assertEqual(mcq.type, 'choices')
+        self.assertEqual(get_object.call_count, 1)
+
+
+class TestCompiledContent(unittest.TestCase):
+    XML_CONTENT = (
+        '<mentoring url_name="compiled" mode="assessment"><title>Title</title><html><p>Intro</p></html>'
+        '<mcq name="mcq"><question>Q?</question><choice value="yes">Yes</choice><choice value="no">No</choice>'
+        '<tip display="yes">Good</tip><tip reject="no"><html><p>Bad</p></html></tip></mcq>'
+        '<mrq name="mrq" hide_results="true"><choice value="a">A</choice><tip require="a">Need A</tip></mrq>'
+        '<message type="completed"><html><p>Done</p></html></message></mentoring>'
+    )
+
+    def setUp(self):
+        compiled_children_cache.clear()
+
+    def make_block(self, **fields):
+        return MentoringBlock(MagicMock(), DictFieldData(fields), Mock())
+
+    def studio_submit(self, xml_content):
+        block = self.make_block()
+        request = Request.blank('/', method='POST', body=json.dumps({'xml_content': xml_content}).encode('utf-8'))
+        self.assertEqual(block.studio_submit(request).json['result'], 'success')
+        return block
+
+    def test_compiled_content_is_loaded_without_parsing(self):
+        studio_block = self.studio_submit(self.XML_CONTENT)
+        data = json.loads(studio_block.compiled_content)
+        self.assertEqual(data['version'], COMPILED_CONTENT_VERSION)
+        self.assertEqual([tag for _, tag, _ in data['nodes']][:3], ['title', 'html', 'mcq'])
+
+        compiled_children_cache.clear()
+        with patch('mentoring.light_children.etree.parse') as parse:
+            block = self.make_block(xml_content=studio_block.xml_content,
+                                    compiled_content=studio_block.compiled_content)
+            tree = describe_tree(block.get_children_objects())
+        self.assertFalse(parse.called)
+
+        compiled_children_cache.clear()
+        parsed_block = self.make_block(xml_content=studio_block.xml_content)
+        self.assertEqual(tree, describe_tree(parsed_block.get_children_objects()))
+        self.assertEqual(block.mode, 'assessment')
+        self.assertEqual(block.max_attempts, parsed_block.max_attempts)
+
+    def test_falls_back_to_xml(self):
+        studio_block = self.studio_submit(self.XML_CONTENT)
+        xml_content, compiled_content = studio_block.xml_content, studio_block.compiled_content
+        outdated = json.loads(compiled_content)
+        outdated['version'] = COMPILED_CONTENT_VERSION - 1
+
+        for xml, compiled in ((xml_content, json.dumps(outdated)),
+                              (xml_content.replace('Intro', 'Changed'), compiled_content),
+                              (xml_content, 'invalid')):
+            self.assert_compiled_from_xml(xml, compiled)
+
+    def test_invalid_compiled_content_falls_back_to_xml(self):
+        studio_block = self.studio_submit(self.XML_CONTENT)
+        xml_content, compiled_content = studio_block.xml_content, studio_block.compiled_content
+
+        truncated = json.loads(compiled_content)
+        del truncated['nodes']
+        bad_parent = json.loads(compiled_content)
+        bad_parent['nodes'][1][0] = 10
+        bad_row = json.loads(compiled_content)
+        bad_row['nodes'][2] = [-1, 'mcq']
+        bad_attrs = json.loads(compiled_content)
+        bad_attrs['attrs'] = [['url_name']]
+
+        for compiled in (compiled_content[:len(compiled_content) // 2], json.dumps(truncated),
+                         json.dumps(bad_parent), json.dumps(bad_row), json.dumps(bad_attrs)):
+            self.assert_compiled_from_xml(xml_content, compiled)
+
+    def assert_compiled_from_xml(self, xml_content, compiled_content):
+        compiled_children_cache.clear()
+        with patch('mentoring.light_children.etree.parse', wraps=etree.parse) as parse:
+            block = self.make_block(xml_content=xml_content, compiled_content=compiled_content)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(len(block.get_children_objects()), 5)
+
+
+class TestLightChildRegistry(unittest.TestCase):
+    def tearDown(self):
+        light_child_registry.reload()
+
+    def test_lookups(self):
+        self.assertIs(light_child_registry.get_class('mcq'), MCQBlock)
+        self.assertIs(light_child_registry.get_class('QUIZZ'), MCQBlock)
+        self.assertEqual(light_child_registry.get_tag(MCQBlock), 'mcq')
+        self.assertEqual(light_child_registry.get_tag(TipBlock), 'tip')
+        with self.assertRaises(PluginMissingError):
+            light_child_registry.get_class('unknown')
+
+    def test_entry_points_are_loaded_once(self):
+        light_child_registry.reload()
+        with patch.object(LightChild, 'load_classes', wraps=LightChild.load_classes) as load_classes:
+            compiled_children_cache.clear()
+            MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+            light_child_registry.get_class('tip')
+            self.assertEqual(load_classes.call_count, 1)
+
+            light_child_registry.reload()
+            light_child_registry.get_class('tip')
+            self.assertEqual(load_classes.call_count, 2)
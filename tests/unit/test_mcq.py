@@ -17,3 +17,24 @@ class TestMCQBlock(unittest.TestCase):
         # Different instance returns a different uuid.
         mcq2 = MCQBlock(block)
         self.assertNotEqual(mcq2.uuid, uuid1)
+
+    def make_mcq(self, tips):
+        xml_content = (
+            '<mentoring><mcq name="mcq"><choice value="yes">Yes</choice><choice value="maybe">Maybe</choice>'
+            '<choice value="no">No</choice>{}</mcq></mentoring>'.format(tips)
+        )
+        block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': xml_content}), Mock())
+        return block.get_children_objects()[0]
+
+    def test_calculate_results(self):
+        mcq = self.make_mcq('<tip display="yes,maybe">Good</tip><tip reject="no">Bad</tip>')
+        self.assertEqual(mcq.calculate_results('yes')['status'], 'correct')
+        self.assertEqual(mcq.calculate_results('no')['status'], 'incorrect')
+        self.assertEqual(mcq.calculate_results('')['status'], 'incorrect')
+        self.assertIn('Good', mcq.calculate_results('maybe')['tips'])
+        self.assertIn('Bad', mcq.calculate_results('no')['tips'])
+        self.assertNotIn('Good', mcq.calculate_results('no')['tips'])
+
+    def test_no_tips_is_correct(self):
+        mcq = self.make_mcq('')
+        self.assertEqual(mcq.calculate_results('')['status'], 'correct')
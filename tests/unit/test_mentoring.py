@@ -1,10 +1,20 @@
+import json
+import re
 import unittest
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from mock import MagicMock, Mock, patch
+from webob import Request
 from xblock.field_data import DictFieldData
+from xblock.fragment import Fragment
 
+from mentoring.light_children import jump_to_url_cache
 from mentoring.mentoring import MentoringBlock
+from mentoring.models import Answer, LightChild as LightChildModel
+from mentoring.questionnaire import QuestionnaireAbstractBlock
+from mentoring.render_cache import render_cache
 
 
 @pytest.mark.django_db
@@ -32,3 +42,215 @@ class TestMentoringBlock(unittest.TestCase):
             block.student_view(context={})
 
             self.assertFalse(patched_runtime.publish.called)
+
+
+@pytest.mark.django_db
+class TestSubmitQueries(unittest.TestCase):
+    def setUp(self):
+        # Store the choices, so the submissions write LightChild rows
+        patcher = patch('mentoring.mcq.MCQBlock.get_fields_to_save', return_value=['student_choice'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_block(self, num_questions):
+        xml_content = '<mentoring url_name="submit_{0}"><answer name="goal_{0}"/>{1}</mentoring>'.format(
+            num_questions,
+            ''.join('<mcq name="mcq_{0}"><choice value="yes">Yes</choice><choice value="no">No</choice>'
+                    '<tip reject="no">Nope</tip></mcq>'.format(i) for i in range(num_questions))
+        )
+        return MentoringBlock(MagicMock(), DictFieldData({'xml_content': xml_content}), Mock())
+
+    def submit(self, block, submissions):
+        request = Request.blank('/', method='POST', body=json.dumps(submissions).encode('utf-8'))
+        with CaptureQueriesContext(connection) as queries:
+            response = block.submit(request)
+        return response.json, len(queries)
+
+    def submissions(self, num_questions, value):
+        submissions = {'mcq_{}'.format(i): value for i in range(num_questions)}
+        submissions['goal_{}'.format(num_questions)] = [{'name': 'input', 'value': 'My goal'}]
+        return submissions
+
+    def test_statement_count_does_not_depend_on_number_of_questions(self):
+        counts = {}
+        for num_questions in (2, 20):
+            block = self.make_block(num_questions)
+            result, counts[num_questions] = self.submit(block, self.submissions(num_questions, 'yes'))
+            self.assertTrue(result['completed'])
+        self.assertEqual(counts[2], counts[20])
+
+        # Rows now exist, and are updated in bulk
+        for num_questions in (2, 20):
+            block = self.make_block(num_questions)
+            _, counts[num_questions] = self.submit(block, self.submissions(num_questions, 'no'))
+        self.assertEqual(counts[2], counts[20])
+
+        self.assertEqual(LightChildModel.objects.filter(name__startswith='submit_20-').count(), 20)
+        self.assertEqual(LightChildModel.objects.get(name='submit_20-mcq_3').student_data, {'student_choice': 'no'})
+        self.assertEqual(Answer.objects.get(name='goal_20').student_input, 'My goal')
+
+    def test_nothing_is_written_on_error(self):
+        block = self.make_block(2)
+        with patch('mentoring.mcq.MCQBlock.calculate_results', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.submit(block, self.submissions(2, 'yes'))
+        self.assertFalse(LightChildModel.objects.filter(name__startswith='submit_2-').exists())
+
+
+@pytest.mark.django_db
+class TestReadOnlyView(unittest.TestCase):
+    XML_CONTENT = (
+        '<mentoring url_name="read_only"><answer name="read_only_goal"/>'
+        '<mcq name="mcq"><choice value="yes">Yes</choice><tip display="yes">Good</tip></mcq></mentoring>'
+    )
+
+    def make_block(self):
+        return MentoringBlock(MagicMock(), DictFieldData({'xml_content': self.XML_CONTENT}), Mock())
+
+    def test_student_view_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.make_block().student_view(context={})
+        self.assertTrue(queries)
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in queries))
+        self.assertFalse(Answer.objects.exists())
+        self.assertFalse(LightChildModel.objects.exists())
+
+    @patch('mentoring.mcq.MCQBlock.get_fields_to_save', return_value=['student_choice'])
+    def test_submit_creates_rows(self, _):
+        self.make_block().student_view(context={})
+        submissions = {'mcq': 'yes', 'read_only_goal': [{'name': 'input', 'value': 'My goal'}]}
+        request = Request.blank('/', method='POST', body=json.dumps(submissions).encode('utf-8'))
+        self.make_block().submit(request)
+
+        self.assertEqual(Answer.objects.get(name='read_only_goal').student_input, 'My goal')
+        self.assertTrue(LightChildModel.objects.filter(name='read_only-mcq').exists())
+        block = self.make_block()
+        self.assertEqual(block.get_children_objects()[0].student_input, 'My goal')
+
+    @patch('mentoring.mcq.MCQBlock.get_fields_to_save', return_value=['student_choice'])
+    def test_rows_created_after_the_read(self, _):
+        block = self.make_block()
+        block.student_view(context={})
+        # Another request creates the rows between the read and the submit
+        Answer.objects.create(student_id='student1', course_id='sample-course', name='read_only_goal',
+                              student_input='Other goal')
+        LightChildModel.objects.create(student_id='student1', course_id='sample-course', name='read_only-mcq')
+
+        submissions = {'mcq': 'yes', 'read_only_goal': [{'name': 'input', 'value': 'My goal'}]}
+        request = Request.blank('/', method='POST', body=json.dumps(submissions).encode('utf-8'))
+        self.assertTrue(block.submit(request).json['completed'])
+
+        self.assertEqual(Answer.objects.get(name='read_only_goal').student_input, 'My goal')
+        self.assertEqual(LightChildModel.objects.get(name='read_only-mcq').student_data, {'student_choice': 'yes'})
+
+
+@pytest.mark.django_db
+class TestScore(unittest.TestCase):
+    def test_student_view_computes_score_once(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        with patch.object(MentoringBlock, 'answer_mapper', autospec=True, return_value=[]) as answer_mapper:
+            block.student_view(context={})
+        # One call per status
+        self.assertEqual(answer_mapper.call_count, 3)
+
+    def test_score_follows_student_results(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        self.assertEqual(block.score.raw, 0)
+
+        request = Request.blank('/', method='POST', body=json.dumps({'mcq_1_1': 'yes'}).encode('utf-8'))
+        block.submit(request)
+        self.assertEqual(block.score.percentage, 25)
+        self.assertEqual([result['id'] for result in block.score.correct], ['mcq_1_1'])
+
+        block.try_again(Request.blank('/', method='POST', body=b'{}'))
+        self.assertEqual(block.score.raw, 0)
+        self.assertEqual(block.score.correct, [])
+
+
+@pytest.mark.django_db
+class TestFragmentResources(unittest.TestCase):
+    def test_questionnaire_resources_are_included_once(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        with patch.object(block, 'runtime') as patched_runtime:
+            patched_runtime.local_resource_url.side_effect = lambda _block, path: '/static/' + path
+            fragment = block.student_view(context={})
+
+        questionnaires = [child for child in block.get_children_objects()
+                          if isinstance(child, QuestionnaireAbstractBlock)]
+        self.assertGreater(len(questionnaires), 1)
+        urls = [resource.data for resource in fragment._resources if resource.kind == 'url']
+        self.assertEqual(urls.count('/static/public/css/questionnaire.css'), 1)
+        self.assertEqual(urls.count('/static/public/js/questionnaire.js'), 1)
+        self.assertFalse(any(resource.mimetype == 'text/css' and resource.kind == 'text'
+                             for resource in fragment._resources))
+
+
+def replace_jump_to_id_urls(course_id, jump_to_url, block, view, frag, context):
+    """
+    Same replacement as the platform's `replace_jump_to_id_urls()`
+    """
+    frag = Fragment.from_dict(frag.to_dict())
+    frag.content = re.sub(r'(?P<quote>\\?[\'"])/jump_to_id/(?P<rest>.*?)(?P=quote)',
+                          lambda match: '{0}{1}{2}{0}'.format(match.group('quote'), jump_to_url, match.group('rest')),
+                          frag.content)
+    return frag
+
+
+class TestTextRewriting(unittest.TestCase):
+    XML_CONTENT = (
+        '<mentoring url_name="rewriting"><html><p><a href="/jump_to_id/intro">Intro</a></p></html>'
+        '<mcq name="mcq"><question>Q</question><choice value="yes"><html><a href="/jump_to_id/yes">Yes</a></html>'
+        '</choice><choice value="no">No</choice></mcq>'
+        '<message type="completed"><html><a href="/jump_to_id/next">Next</a></html></message></mentoring>'
+    )
+
+    def setUp(self):
+        render_cache.clear()
+        jump_to_url_cache.clear()
+
+    def make_block(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': self.XML_CONTENT}), Mock())
+        block.xmodule_runtime = Mock(course_id='course')
+        return block
+
+    @patch.object(QuestionnaireAbstractBlock, 'uuid', 'uuid')
+    @patch('mentoring.light_children.reverse', return_value='/courses/course/jump_to_id/')
+    @patch('mentoring.light_children.replace_jump_to_id_urls', side_effect=replace_jump_to_id_urls)
+    def test_single_pass_output_is_identical(self, replace, reverse):
+        block = self.make_block()
+        html = block.view(Request.blank('/', method='POST', body=b'{}')).json['html']
+        self.assertEqual(replace.call_count, 1)
+        self.assertEqual(reverse.call_count, 1)
+        self.assertEqual(block.get_message_html('completed').count('/courses/course/jump_to_id/next'), 1)
+
+        # Previous behavior: each child fragment is rewritten, then the whole view
+        render_cache.clear()
+        block = self.make_block()
+        with patch.object(MentoringBlock, 'text_rewriting_deferred', False):
+            expected = block.fragment_text_rewriting(block.student_view({})).content
+        self.assertGreater(replace.call_count, 3)
+        self.assertEqual(reverse.call_count, 1)
+
+        self.assertEqual(html, expected)
+        self.assertNotIn('"/jump_to_id/', html)
+        self.assertIn('/courses/course/jump_to_id/yes', html)
+        self.assertIn('/courses/course/jump_to_id/intro', html)
+
+
+class TestMessages(unittest.TestCase):
+    XML_CONTENT = (
+        '<mentoring url_name="messages"><mcq name="mcq"><choice value="yes">Yes</choice></mcq>'
+        '<message type="completed"><html><p>Done</p></html></message>'
+        '<message type="incomplete"><html><p>Not yet</p></html></message>'
+        '<message type="completed"><html><p>Ignored</p></html></message></mentoring>'
+    )
+
+    def test_messages_are_rendered_once(self):
+        block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': self.XML_CONTENT}), Mock())
+        self.assertEqual(sorted(block.messages_by_type), ['completed', 'incomplete'])
+        with patch.object(MentoringBlock, 'render_child', wraps=block.render_child) as render_child:
+            for _ in range(3):
+                self.assertIn('Done', block.get_message(True))
+                self.assertIn('Not yet', block.get_message(False))
+                self.assertEqual(block.get_message_html('on-assessment-review'), '')
+        self.assertEqual(render_child.call_count, 2)
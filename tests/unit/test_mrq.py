@@ -17,3 +17,44 @@ class TestMRQBlock(unittest.TestCase):
         # Different instance returns a different uuid.
         mrq2 = MRQBlock(block)
         self.assertNotEqual(mrq2.uuid, uuid1)
+
+    def test_calculate_results(self):
+        xml_content = (
+            '<mentoring><mrq name="mrq"><choice value="a">A</choice><choice value="b">B</choice>'
+            '<choice value="c">C</choice><tip require="a">Need A</tip><tip reject="b">Not B</tip>'
+            '<tip display="c">About C</tip><tip display="a,c">About A and C</tip></mrq></mentoring>'
+        )
+        block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': xml_content}), Mock())
+        mrq = block.get_children_objects()[0]
+
+        self.assertEqual(mrq.tip_rules.required, {'a'})
+        self.assertEqual(mrq.tip_rules.rejected, {'b'})
+        self.assertEqual([tip.content for tip in mrq.get_tips_to_display('c')], ['About C', 'About A and C'])
+
+        result = mrq.calculate_results(['a', 'c'])
+        self.assertEqual(result['status'], 'correct')
+        self.assertEqual([choice['completed'] for choice in result['choices']], [True, True, True])
+
+        result = mrq.calculate_results(['b'])
+        self.assertEqual(result['status'], 'partial')
+        self.assertEqual([choice['completed'] for choice in result['choices']], [False, False, True])
+        self.assertEqual(result['score'], 1.0 / 3)
+        self.assertIn('Need A', result['choices'][0]['tips'])
+        self.assertIn('About A and C', result['choices'][2]['tips'])
+
+    def test_client_side_tips(self):
+        xml_content = (
+            '<mentoring><mrq name="mrq" client_side_tips="true"><choice value="a">A</choice>'
+            '<choice value="b">B</choice><tip display="a">About A</tip><tip reject="b">Not B</tip></mrq></mentoring>'
+        )
+        block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': xml_content}), Mock())
+        mrq = block.get_children_objects()[0]
+        tip_names = [tip.name for tip in mrq.get_tips()]
+
+        result = mrq.calculate_results(['b'])
+        self.assertEqual([choice['tip_ids'] for choice in result['choices']], [tip_names[:1], tip_names[1:]])
+        self.assertFalse(any('tips' in choice for choice in result['choices']))
+
+        html = mrq.student_view({}).content
+        self.assertIn('data-tip-id="{}"'.format(tip_names[0]), html)
+        self.assertIn('About A', html)
@@ -0,0 +1,66 @@
+import unittest
+
+from mock import MagicMock, Mock, patch
+from xblock.field_data import DictFieldData
+
+from mentoring.mentoring import MentoringBlock
+from mentoring.render_cache import DjangoRenderCacheBackend, LocalMemoryRenderCacheBackend, render_cache
+from mentoring.utils import loader
+
+
+class TestRenderCache(unittest.TestCase):
+    XML_CONTENT = (
+        '<mentoring url_name="render_cache"><html><p>Intro</p></html>'
+        '<mcq name="mcq"><choice value="yes">Yes</choice><tip display="yes">Good</tip></mcq></mentoring>'
+    )
+
+    def setUp(self):
+        self.backend = render_cache.backend
+        render_cache.backend = LocalMemoryRenderCacheBackend()
+
+    def tearDown(self):
+        render_cache.backend = self.backend
+
+    def make_block(self, course_id='course'):
+        block = MentoringBlock(MagicMock(), DictFieldData({'xml_content': self.XML_CONTENT}), Mock())
+        block.xmodule_runtime = Mock(course_id=course_id)
+        return block
+
+    def get_tip(self, block):
+        return block.get_children_objects()[1].get_tips()[0]
+
+    def test_content_is_rendered_once(self):
+        with patch.object(loader, 'render_template', wraps=loader.render_template) as render_template:
+            first = self.get_tip(self.make_block()).render()
+            second = self.get_tip(self.make_block()).render()
+        self.assertEqual(render_template.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertIn('Good', second.content)
+        self.assertIsNot(first, second)
+
+    def test_key_depends_on_package_version(self):
+        with patch.object(loader, 'render_template', wraps=loader.render_template) as render_template:
+            with patch('mentoring.light_children.PACKAGE_VERSION', '1.0'):
+                self.get_tip(self.make_block()).render()
+            with patch('mentoring.light_children.PACKAGE_VERSION', '1.1'):
+                self.get_tip(self.make_block()).render()
+                self.get_tip(self.make_block()).render()
+        self.assertEqual(render_template.call_count, 2)
+
+    def test_key_depends_on_view_and_course(self):
+        html = self.make_block().get_children_objects()[0]
+        self.assertIn('<script', html.student_view({}).content)
+        self.assertNotIn('<script', html.student_view({'as_template': False}).content)
+
+        with patch.object(loader, 'render_template', wraps=loader.render_template) as render_template:
+            self.get_tip(self.make_block('course')).render()
+            self.get_tip(self.make_block('other')).render()
+        self.assertEqual(render_template.call_count, 2)
+
+    def test_django_cache_backend(self):
+        render_cache.backend = DjangoRenderCacheBackend('default')
+        first = self.get_tip(self.make_block()).render()
+        with patch.object(loader, 'render_template') as render_template:
+            second = self.get_tip(self.make_block()).render()
+        self.assertFalse(render_template.called)
+        self.assertEqual(first.to_dict(), second.to_dict())
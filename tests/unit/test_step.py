@@ -1,7 +1,7 @@
 import copy
 import unittest
 
-from mock import MagicMock, Mock
+from mock import MagicMock, Mock, patch
 from xblock.field_data import DictFieldData
 
 from mentoring.mentoring import MentoringBlock
@@ -113,3 +113,33 @@ class TestFieldMigration(unittest.TestCase):
         del migrated_student_results[1][1]['completed']
         mentoring.migrate_fields()
         self.assertEqual(migrated_student_results, mentoring.student_results)
+
+
+class TestStepIndex(unittest.TestCase):
+    def test_index_is_built_once(self):
+        block = Parent()
+        steps = [Step() for _ in range(50)]
+        block._set_children_for_test(*steps)
+
+        with patch.object(Parent, 'get_children_objects', wraps=block.get_children_objects) as get_children:
+            self.assertEqual([step.step_number for step in steps], list(range(1, 51)))
+            self.assertFalse(any(step.lonely_step for step in steps))
+            self.assertEqual(block.step_count, 50)
+        self.assertEqual(get_children.call_count, 1)
+
+    def test_step_not_in_parent(self):
+        block = Parent()
+        block._set_children_for_test(Step())
+        stray = Step()
+        stray.parent = block
+        with self.assertRaises(ValueError):
+            _ = stray.step_number
+        with self.assertRaises(ValueError):
+            _ = stray.lonely_step
+
+    def test_question_number_lookup(self):
+        mentoring = MentoringBlock(MagicMock(), DictFieldData({}), Mock())
+        self.assertEqual(mentoring.get_question_number('goal'), 1)
+        self.assertEqual(mentoring.get_question_number('mrq_1_3'), 4)
+        with self.assertRaises(ValueError):
+            mentoring.get_question_number('unknown')
@@ -0,0 +1,33 @@
+import unittest
+
+from mock import patch
+
+from mentoring.utils import MentoringResourceLoader, loader
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        MentoringResourceLoader.template_cache.clear()
+
+    def test_template_is_compiled_once(self):
+        context = {'self': {'content': 'Great', 'width': 0, 'height': 0}}
+        with patch.object(MentoringResourceLoader, 'load_unicode', wraps=loader.load_unicode) as load_unicode:
+            first = loader.render_template('templates/html/tip.html', dict(context))
+            second = loader.render_template('templates/html/tip.html', dict(context))
+        self.assertEqual(first, second)
+        self.assertIn('Great', first)
+        self.assertEqual(load_unicode.call_count, 1)
+        self.assertEqual(MentoringResourceLoader.template_cache.stats()['misses'], 1)
+        self.assertEqual(MentoringResourceLoader.template_cache.stats()['hits'], 1)
+
+    def test_cache_is_keyed_by_package_version(self):
+        loader.get_template('templates/html/tip.html')
+        with patch('mentoring.utils.PACKAGE_VERSION', 'upgraded'):
+            loader.get_template('templates/html/tip.html')
+        self.assertEqual(MentoringResourceLoader.template_cache.stats()['misses'], 2)
+
+    def test_cached_and_uncached_renders_match(self):
+        context = {'self': {'content': 'Great', 'width': 200, 'height': 100}}
+        uncached = super(MentoringResourceLoader, loader).render_django_template(
+            'templates/html/tip.html', dict(context))
+        self.assertEqual(loader.render_django_template('templates/html/tip.html', dict(context)), uncached)